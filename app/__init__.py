@@ -5,6 +5,7 @@ from flask_mail import Mail
 from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
 from flask_migrate import Migrate
+from werkzeug.middleware.proxy_fix import ProxyFix
 from app.config import Config
 import cloudinary
 
@@ -22,6 +23,11 @@ def create_app(config_class=Config):
     app.config['SQLALCHEMY_POOL_RECYCLE'] = 280
     app.config['SQLALCHEMY_POOL_TIMEOUT'] = 20
 
+    # Behind a reverse proxy, trust its X-Forwarded-For so rate limits see the real client IP
+    if app.config.get('TRUSTED_PROXY_COUNT'):
+        proxies = app.config['TRUSTED_PROXY_COUNT']
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies)
+
     CORS(app, resources={r"/api/*": {"origins": ["https://bolaji.tech", "https://www.bolaji.tech", "http://localhost:5173"]}})
 
     db.init_app(app)
@@ -29,6 +35,9 @@ def create_app(config_class=Config):
     bcrypt.init_app(app)
     jwt.init_app(app)
     migrate.init_app(app, db)
+
+    from app.services.cache import response_cache
+    response_cache.init_app(app)
     
     cloudinary.config(
         cloud_name = app.config['CLOUDINARY_CLOUD_NAME'],
@@ -36,12 +45,49 @@ def create_app(config_class=Config):
         api_secret = app.config['CLOUDINARY_API_SECRET']
     )
 
-    from app.models import project, product, admin, about, blog, order, booking
+    from app.models import project, product, admin, about, blog, order, booking, media, outbox, stamp
+
+    from app.services.view_counter import view_counter
+    view_counter.init_app(app)
+
+    from app.services.search import search_index
+    search_index.init_app(app)
+
+    from app.services.related import related_refresher
+    related_refresher.init_app(app)
+
+    from app.services.project_index import project_index
+    project_index.init_app(app)
+
+    from app.services.images import image_processor
+    image_processor.init_app(app)
+
+    from app.services.outbox import email_outbox
+    email_outbox.init_app(app)
+
+    from app.services.spotify import spotify_client, spotify_poller
+    spotify_client.init_app(app)
+    spotify_poller.init_app(app)
+
+    from app.services.identity_cache import admin_identity_cache
+    admin_identity_cache.init_app(app)
+
+    from app.services.login_guard import login_guard
+    login_guard.init_app(app)
+
+    from app.services.rate_limit import rate_limiter
+    rate_limiter.init_app(app)
 
     @jwt.user_lookup_loader
     def user_lookup_callback(_jwt_header, jwt_data):
         identity = jwt_data["sub"]
-        return admin.Admin.query.get(identity)
+        return admin_identity_cache.load(identity)
+
+    @app.cli.command('rebuild-related')
+    def rebuild_related_command():
+        """Recompute the precomputed related-posts table for every post."""
+        from app.services.related import rebuild_related_posts
+        print(f"Stored {rebuild_related_posts()} related-post rows.")
 
     from app.routes.portfolio_routes import portfolio_bp
     from app.routes.blog_routes import blog_bp
@@ -50,6 +96,7 @@ def create_app(config_class=Config):
     from app.routes.auth_routes import auth_bp
     from app.routes.about_routes import about_bp
     from app.routes.booking_routes import booking_bp
+    from app.routes.metrics_routes import metrics_bp
 
     app.register_blueprint(portfolio_bp, url_prefix='/api/portfolio')
     app.register_blueprint(blog_bp, url_prefix='/api/blog')
@@ -58,5 +105,6 @@ def create_app(config_class=Config):
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(about_bp, url_prefix='/api/about')
     app.register_blueprint(booking_bp, url_prefix='/api/booking')
+    app.register_blueprint(metrics_bp, url_prefix='/api/metrics')
 
     return app
\ No newline at end of file
@@ -25,4 +25,92 @@ class Config:
     # Cloudinary Configuration
     CLOUDINARY_CLOUD_NAME = os.environ.get('CLOUDINARY_CLOUD_NAME')
     CLOUDINARY_API_KEY = os.environ.get('CLOUDINARY_API_KEY')
-    CLOUDINARY_API_SECRET = os.environ.get('CLOUDINARY_API_SECRET')
\ No newline at end of file
+    CLOUDINARY_API_SECRET = os.environ.get('CLOUDINARY_API_SECRET')
+
+    # Seconds to cache the admin row behind each JWT; 0 looks it up on every request
+    ADMIN_IDENTITY_CACHE_TTL = int(os.environ.get('ADMIN_IDENTITY_CACHE_TTL') or 60)
+
+    # Login throttling (token buckets) and bounded bcrypt pool
+    LOGIN_IP_BURST = int(os.environ.get('LOGIN_IP_BURST') or 10)
+    LOGIN_IP_PER_MINUTE = float(os.environ.get('LOGIN_IP_PER_MINUTE') or 5)
+    LOGIN_USERNAME_BURST = int(os.environ.get('LOGIN_USERNAME_BURST') or 5)
+    LOGIN_USERNAME_PER_MINUTE = float(os.environ.get('LOGIN_USERNAME_PER_MINUTE') or 2)
+    BCRYPT_WORKERS = int(os.environ.get('BCRYPT_WORKERS') or 2)
+    BCRYPT_QUEUE_LIMIT = int(os.environ.get('BCRYPT_QUEUE_LIMIT') or 8)
+
+    # Rate limits for public write endpoints ("<count>/<second|minute|hour|day>" per client IP).
+    # 'memory' counts per worker process; 'sqlite' shares counts between workers on one host.
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'True') == 'True'
+    RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND') or 'memory'
+    RATE_LIMIT_SQLITE_PATH = os.environ.get('RATE_LIMIT_SQLITE_PATH') # defaults to instance/rate_limit.sqlite3
+    RATE_LIMIT_POLICIES = {
+        'contact': os.environ.get('RATE_LIMIT_CONTACT') or '5/hour',
+        'order': os.environ.get('RATE_LIMIT_ORDER') or '10/hour',
+        'booking': os.environ.get('RATE_LIMIT_BOOKING') or '10/hour',
+        'post_view': os.environ.get('RATE_LIMIT_POST_VIEW') or '60/minute'
+    }
+
+    # Booking slots: the grid slot start times sit on and the widest date range per request. Bookings
+    # must start on this grid and claim every block of it they touch, so changing it on a live
+    # database needs the claims rebuilt (see the d58e2b7a4c19 migration); it should divide 1440.
+    BOOKING_SLOT_STEP_MINUTES = int(os.environ.get('BOOKING_SLOT_STEP_MINUTES') or 30)
+    BOOKING_SLOTS_MAX_DAYS = int(os.environ.get('BOOKING_SLOTS_MAX_DAYS') or 62)
+
+    # Number of reverse proxies in front of the app (0 uses the socket address as the client IP)
+    TRUSTED_PROXY_COUNT = int(os.environ.get('TRUSTED_PROXY_COUNT') or 0)
+
+    # Response cache for public GET endpoints
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL') or 60)
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES') or 512)
+    RESPONSE_CACHE_DISABLED = os.environ.get('RESPONSE_CACHE_DISABLED') == 'True'
+    # /api/about: admin edits only evict the cache in the worker that served them; the others
+    # keep their copy until it expires, so keep this short unless running a single process
+    ABOUT_CACHE_TTL = int(os.environ.get('ABOUT_CACHE_TTL') or 60)
+
+    # Buffered post view counting
+    VIEW_COUNT_FLUSH_INTERVAL = float(os.environ.get('VIEW_COUNT_FLUSH_INTERVAL') or 5)
+    VIEW_COUNT_FLUSH_EVENTS = int(os.environ.get('VIEW_COUNT_FLUSH_EVENTS') or 100)
+
+    # Blog search: 'memory' (BM25 inverted index) or 'mysql' (FULLTEXT, falls back to memory elsewhere)
+    SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND') or 'memory'
+    SEARCH_INDEX_MAX_AGE = int(os.environ.get('SEARCH_INDEX_MAX_AGE') or 300)
+
+    # Related posts are recomputed in the background, at the latest this many seconds after a write
+    RELATED_REFRESH_INTERVAL = float(os.environ.get('RELATED_REFRESH_INTERVAL') or 30)
+
+    # Portfolio project facets (rebuilt on writes; other workers catch up within this many seconds)
+    PROJECT_INDEX_MAX_AGE = int(os.environ.get('PROJECT_INDEX_MAX_AGE') or 300)
+
+    # RSS feed
+    RSS_MAX_ITEMS = int(os.environ.get('RSS_MAX_ITEMS') or 50)
+
+    # Image uploads (variants need Pillow)
+    UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER') # defaults to app/static/uploads
+    UPLOAD_MAX_BYTES = int(os.environ.get('UPLOAD_MAX_BYTES') or 10 * 1024 * 1024)
+    IMAGE_VARIANT_WIDTHS = tuple(int(w) for w in (os.environ.get('IMAGE_VARIANT_WIDTHS') or '480,960,1600').split(','))
+    IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS') or 2)
+    IMAGE_QUEUE_LIMIT = int(os.environ.get('IMAGE_QUEUE_LIMIT') or 16)
+    IMAGE_PENDING_TIMEOUT = int(os.environ.get('IMAGE_PENDING_TIMEOUT') or 600) # seconds before a pending job counts as lost
+
+    # Email outbox delivery
+    OUTBOX_POLL_INTERVAL = float(os.environ.get('OUTBOX_POLL_INTERVAL') or 15)
+    OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE') or 20)
+    OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS') or 6)
+    OUTBOX_BACKOFF_SECONDS = int(os.environ.get('OUTBOX_BACKOFF_SECONDS') or 30)
+
+    # Spotify now playing (URLs can point at a local stub)
+    SPOTIFY_CLIENT_ID = os.environ.get('SPOTIFY_CLIENT_ID')
+    SPOTIFY_CLIENT_SECRET = os.environ.get('SPOTIFY_CLIENT_SECRET')
+    SPOTIFY_REFRESH_TOKEN = os.environ.get('SPOTIFY_REFRESH_TOKEN')
+    SPOTIFY_TOKEN_URL = os.environ.get('SPOTIFY_TOKEN_URL') or 'https://accounts.spotify.com/api/token'
+    SPOTIFY_API_URL = os.environ.get('SPOTIFY_API_URL') or 'https://api.spotify.com/v1'
+    SPOTIFY_NOW_PLAYING_TTL = float(os.environ.get('SPOTIFY_NOW_PLAYING_TTL') or 5)
+    SPOTIFY_TIMEOUT = float(os.environ.get('SPOTIFY_TIMEOUT') or 5)
+    SPOTIFY_POLL_INTERVAL = float(os.environ.get('SPOTIFY_POLL_INTERVAL') or 10)
+    SPOTIFY_STREAM_HEARTBEAT = float(os.environ.get('SPOTIFY_STREAM_HEARTBEAT') or 25)
+    # Each open /spotify/stream holds a server thread for up to SPOTIFY_STREAM_MAX_AGE seconds, so the
+    # per-process cap must stay below the worker's thread count (gunicorn -k gthread --threads N, or
+    # gevent to raise it). Under sync workers set it to 0: clients get 503 and fall back to polling.
+    SPOTIFY_STREAM_MAX_CLIENTS = int(os.environ.get('SPOTIFY_STREAM_MAX_CLIENTS') or 8)
+    SPOTIFY_STREAM_MAX_AGE = float(os.environ.get('SPOTIFY_STREAM_MAX_AGE') or 300)
+    SPOTIFY_STREAM_RECONNECT_MS = int(os.environ.get('SPOTIFY_STREAM_RECONNECT_MS') or 3000)
@@ -0,0 +1,7 @@
+def split_list(value, separator=','):
+    """Normalize a list field at write time: admin forms send 'a, b' strings, API clients send lists."""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split(separator)
+    return [item.strip() for item in value if item and item.strip()]
@@ -1,6 +1,7 @@
 from app import db
 from datetime import datetime
 from sqlalchemy.dialects.mysql import MEDIUMTEXT
+from sqlalchemy.orm import deferred, selectinload
 
 class PostReadlistOrder(db.Model):
     __tablename__ = 'posts_readlists'
@@ -22,10 +23,17 @@ class Category(db.Model):
         return {'id': self.id, 'name': self.name, 'slug': self.slug, 'color': self.color}
 
 class Post(db.Model):
+    __table_args__ = (
+        db.Index('ix_post_fulltext', 'title', 'excerpt', 'content', mysql_prefix='FULLTEXT').ddl_if(dialect='mysql'),
+        db.Index('ix_post_featured_date_id', 'is_featured', 'date_posted', 'id'),
+        db.Index('ix_post_category_date_id', 'category_id', 'date_posted', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(150), nullable=False, unique=True)
     slug = db.Column(db.String(150), nullable=False, unique=True)
-    content = db.Column(MEDIUMTEXT, nullable=False)
+    # Deferred: list/card queries never pull the body; callers that need it use undefer(Post.content)
+    content = deferred(db.Column(MEDIUMTEXT, nullable=False))
     excerpt = db.Column(db.String(300), nullable=True)
     author = db.Column(db.String(100), default="Bolaji")
     date_posted = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -34,19 +42,40 @@ class Post(db.Model):
     category_id = db.Column(db.Integer, db.ForeignKey('category.id'), nullable=True)
     view_count = db.Column(db.Integer, default=0)
 
-    readlist_associations = db.relationship('PostReadlistOrder', back_populates='post')
+    readlist_associations = db.relationship('PostReadlistOrder', back_populates='post', cascade="all, delete-orphan")
 
-    def to_dict(self, include_readlists=False):
+    def to_dict(self, include_readlists=False, include_content=False):
         data = {
-            'id': self.id, 'title': self.title, 'slug': self.slug, 'content': self.content,
+            'id': self.id, 'title': self.title, 'slug': self.slug,
             'excerpt': self.excerpt, 'author': self.author, 'date_posted': self.date_posted.isoformat(),
             'image_url': self.image_url, 'is_featured': self.is_featured,
             'category': self.category.to_dict() if self.category else None, 'view_count': self.view_count
         }
+        if include_content:
+            data['content'] = self.content
         if include_readlists:
             data['readlists'] = [assoc.readlist_id for assoc in self.readlist_associations]
         return data
 
+class RelatedPost(db.Model):
+    """Precomputed neighbours of a post: previous/next by date and the most similar posts
+    in its category and readlists. Maintained by app.services.related."""
+    __tablename__ = 'post_related'
+    post_id = db.Column(db.Integer, db.ForeignKey('post.id', ondelete='CASCADE'), primary_key=True)
+    kind = db.Column(db.String(10), primary_key=True) # previous, next, category, series
+    rank = db.Column(db.Integer, primary_key=True, default=0)
+    related_post_id = db.Column(db.Integer, db.ForeignKey('post.id', ondelete='CASCADE'), nullable=False)
+    score = db.Column(db.Float, nullable=True)
+
+    related = db.relationship('Post', foreign_keys=[related_post_id])
+
+class PostTerms(db.Model):
+    """Weighted term counts of a post's title, excerpt and body, so related-post scoring never
+    re-reads unchanged bodies. Maintained by app.services.related."""
+    __tablename__ = 'post_terms'
+    post_id = db.Column(db.Integer, db.ForeignKey('post.id', ondelete='CASCADE'), primary_key=True)
+    terms = db.Column(db.JSON, nullable=False) # {term: weighted count}
+
 class Readlist(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False, unique=True)
@@ -55,11 +84,19 @@ class Readlist(db.Model):
     image_url = db.Column(db.String(200), nullable=True)
     order = db.Column(db.Integer, default=0)
 
-    post_associations = db.relationship('PostReadlistOrder', back_populates='readlist', cascade="all, delete-orphan")
-    
+    post_associations = db.relationship('PostReadlistOrder', back_populates='readlist', cascade="all, delete-orphan",
+                                        order_by='PostReadlistOrder.post_order')
+
+    @classmethod
+    def with_posts(cls):
+        """Query that loads readlists, their ordered posts and the posts' categories in two queries total."""
+        return cls.query.options(
+            selectinload(cls.post_associations).joinedload(PostReadlistOrder.post).joinedload(Post.category)
+        )
+
     @property
     def posts(self):
-        return [assoc.post for assoc in sorted(self.post_associations, key=lambda x: x.post_order)]
+        return [assoc.post for assoc in self.post_associations]
 
     def to_dict(self, include_posts=False):
         data = {
@@ -1,5 +1,8 @@
 from app import db
 from datetime import datetime
+from sqlalchemy.orm import validates
+
+ACTIVE_BOOKING_STATUSES = ('Pending', 'Confirmed')
 
 class Availability(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -16,6 +19,12 @@ class Availability(db.Model):
         }
 
 class Booking(db.Model):
+    __table_args__ = (
+        db.Index('ix_booking_meeting_time', 'meeting_time'),
+        db.Index('ix_booking_created_at', 'created_at'),
+        db.Index('ix_booking_status_meeting_time', 'status', 'meeting_time'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     client_name = db.Column(db.String(100), nullable=False)
     client_email = db.Column(db.String(120), nullable=False)
@@ -23,7 +32,16 @@ class Booking(db.Model):
     meeting_duration = db.Column(db.Integer, nullable=False) # in minutes
     notes = db.Column(db.Text, nullable=True)
     status = db.Column(db.String(20), default='Pending') # Pending, Confirmed, Cancelled
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    claims = db.relationship('BookingSlotClaim', cascade='all, delete-orphan')
+
+    @validates('status')
+    def _release_claims(self, key, status):
+        # A cancelled booking must not keep its slots; delete-orphan removes the rows on flush
+        if status not in ACTIVE_BOOKING_STATUSES:
+            self.claims = []
+        return status
 
     def to_dict(self):
         return {
@@ -34,4 +52,10 @@ class Booking(db.Model):
             'meeting_duration': self.meeting_duration,
             'notes': self.notes,
             'status': self.status
-        }
\ No newline at end of file
+        }
+
+class BookingSlotClaim(db.Model):
+    """One row per time granule a booking occupies; the primary key makes overlapping inserts fail."""
+    __tablename__ = 'booking_slot_claim'
+    slot_start = db.Column(db.DateTime, primary_key=True)
+    booking_id = db.Column(db.Integer, db.ForeignKey('booking.id', ondelete='CASCADE'), nullable=False, index=True)
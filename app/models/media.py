@@ -0,0 +1,29 @@
+from app import db
+from datetime import datetime
+
+class UploadedImage(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    content_hash = db.Column(db.String(64), nullable=False, unique=True) # sha256 of the original bytes
+    extension = db.Column(db.String(10), nullable=False)
+    size_bytes = db.Column(db.Integer, nullable=False)
+    width = db.Column(db.Integer, nullable=True)
+    height = db.Column(db.Integer, nullable=True)
+    variants = db.Column(db.JSON, nullable=True) # {"480": "/static/uploads/<hash>_w480.webp", ...}
+    status = db.Column(db.String(20), nullable=False, default='pending') # pending, ready, original, failed
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    queued_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow) # last time it went pending
+
+    @property
+    def filename(self):
+        return f"{self.content_hash}.{self.extension}"
+
+    def to_dict(self):
+        return {
+            'url': f"/static/uploads/{self.filename}",
+            'hash': self.content_hash,
+            'size_bytes': self.size_bytes,
+            'width': self.width,
+            'height': self.height,
+            'variants': self.variants or {},
+            'status': self.status
+        }
@@ -2,6 +2,10 @@ from app import db
 from datetime import datetime
 
 class ProductOrder(db.Model):
+    __table_args__ = (
+        db.Index('ix_product_order_order_date', 'order_date'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     customer_name = db.Column(db.String(100), nullable=False)
     customer_email = db.Column(db.String(120), nullable=False)
@@ -20,4 +24,13 @@ class ProductOrder(db.Model):
             'product_name': self.product.name,
             'order_date': self.order_date.isoformat(),
             'status': self.status
-        }
\ No newline at end of file
+        }
+
+class SalesDaily(db.Model):
+    """Per-day, per-category order and sales totals, kept up to date by app.services.sales_rollup."""
+    __tablename__ = 'sales_daily'
+    day = db.Column(db.Date, primary_key=True)
+    category_id = db.Column(db.Integer, primary_key=True, default=0) # 0 = uncategorized
+    orders = db.Column(db.Integer, nullable=False, default=0)
+    sold = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
@@ -1,4 +1,20 @@
 from app import db
+from app.models import split_list
+from sqlalchemy.orm import validates
+
+TAG_MAX_LENGTH = 50
+
+def normalize_tags(names):
+    """Strip and truncate to the column width, then drop repeats case-insensitively (first spelling
+    wins), as MySQL's case-insensitive collation would reject them on the (product_id, tag) key."""
+    seen = set()
+    result = []
+    for name in names:
+        name = name.strip()[:TAG_MAX_LENGTH].strip()
+        if name and name.lower() not in seen:
+            seen.add(name.lower())
+            result.append(name)
+    return result
 
 class ProductCategory(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -10,22 +26,43 @@ class ProductCategory(db.Model):
         return {'id': self.id, 'name': self.name, 'slug': self.slug}
 
 class Product(db.Model):
+    __table_args__ = (
+        db.Index('ix_product_price', 'price'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     slug = db.Column(db.String(100), nullable=False, unique=True)
     subtitle = db.Column(db.String(255), nullable=True)
     description = db.Column(db.Text, nullable=False)
-    features = db.Column(db.Text, nullable=True)
+    features = db.Column(db.JSON, nullable=False, default=list) # one entry per line of the admin form
     price = db.Column(db.Float, nullable=False)
     image_url = db.Column(db.String(200), nullable=True)
-    gallery_images = db.Column(db.Text, nullable=True)
+    gallery_images = db.Column(db.JSON, nullable=False, default=list)
     product_url = db.Column(db.String(200), nullable=False)
     demo_url = db.Column(db.String(200), nullable=True)
-    tags = db.Column(db.String(200), nullable=True)
     rating = db.Column(db.Float, default=0.0)
     rating_count = db.Column(db.Integer, default=0)
     is_sold = db.Column(db.Boolean, default=False) # New field
+    sold_at = db.Column(db.DateTime, nullable=True) # set when is_sold turns on; dates the sale in sales_daily
     category_id = db.Column(db.Integer, db.ForeignKey('product_category.id'), nullable=True)
+    tag_rows = db.relationship('ProductTag', order_by='ProductTag.position', cascade='all, delete-orphan', lazy='selectin')
+
+    @validates('features')
+    def _split_features(self, key, value):
+        return split_list(value, '\n')
+
+    @validates('gallery_images')
+    def _split_gallery_images(self, key, value):
+        return split_list(value)
+
+    @property
+    def tags(self):
+        return [row.tag for row in self.tag_rows]
+
+    def set_tags(self, tags):
+        """Accepts a list or the comma-separated string the admin form sends."""
+        self.tag_rows = [ProductTag(tag=name, position=i) for i, name in enumerate(normalize_tags(split_list(tags)))]
 
     def to_dict(self):
         return {
@@ -34,15 +71,25 @@ class Product(db.Model):
             'slug': self.slug,
             'subtitle': self.subtitle,
             'description': self.description,
-            'features': self.features.split('\n') if self.features else [],
+            'features': self.features or [],
             'price': self.price,
             'image_url': self.image_url,
-            'gallery_images': self.gallery_images.split(',') if self.gallery_images else [],
+            'gallery_images': self.gallery_images or [],
             'product_url': self.product_url,
             'demo_url': self.demo_url,
-            'tags': self.tags.split(',') if self.tags else [],
+            'tags': self.tags,
             'rating': self.rating,
             'rating_count': self.rating_count,
             'is_sold': self.is_sold,
             'category': self.category.to_dict() if self.category else None
-        }
\ No newline at end of file
+        }
+
+class ProductTag(db.Model):
+    __tablename__ = 'product_tag'
+    __table_args__ = (
+        db.Index('ix_product_tag_tag_product', 'tag', 'product_id'),
+    )
+
+    product_id = db.Column(db.Integer, db.ForeignKey('product.id', ondelete='CASCADE'), primary_key=True)
+    tag = db.Column(db.String(TAG_MAX_LENGTH), primary_key=True)
+    position = db.Column(db.Integer, nullable=False, default=0)
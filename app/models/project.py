@@ -1,12 +1,14 @@
 from app import db
+from app.models import split_list
+from sqlalchemy.orm import validates
 
 class Project(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=False)
     role = db.Column(db.String(255), nullable=True) # New field
-    tech_stack = db.Column(db.String(200), nullable=True)
-    tools = db.Column(db.String(200), nullable=True)
+    tech_stack = db.Column(db.JSON, nullable=False, default=list)
+    tools = db.Column(db.JSON, nullable=False, default=list)
     live_url = db.Column(db.String(200), nullable=True)
     github_url = db.Column(db.String(200), nullable=True)
     case_study_url = db.Column(db.String(200), nullable=True)
@@ -16,14 +18,18 @@ class Project(db.Model):
     collaborators = db.Column(db.String(200), nullable=True) # Restored
     order = db.Column(db.Integer, default=0, nullable=False)
 
+    @validates('tech_stack', 'tools')
+    def _split_lists(self, key, value):
+        return split_list(value)
+
     def to_dict(self):
         return {
             'id': self.id,
             'title': self.title,
             'description': self.description,
             'role': self.role,
-            'tech_stack': self.tech_stack.split(',') if self.tech_stack else [],
-            'tools': self.tools.split(',') if self.tools else [],
+            'tech_stack': self.tech_stack or [],
+            'tools': self.tools or [],
             'live_url': self.live_url,
             'github_url': self.github_url,
             'case_study_url': self.case_study_url,
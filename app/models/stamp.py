@@ -0,0 +1,12 @@
+from app import db
+from datetime import datetime
+
+class ChangeStamp(db.Model):
+    """When a named piece of public content last changed, shared by every worker process.
+
+    Bumped by the writes that affect it (see app.services.change_stamps); deletes included, which
+    a max() over the remaining rows cannot see.
+    """
+    __tablename__ = 'change_stamp'
+    name = db.Column(db.String(50), primary_key=True)
+    changed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -1,8 +1,9 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token
 from app.models.admin import Admin
-from app import db, mail, bcrypt
-from flask_mail import Message
+from app import db
+from app.services.outbox import email_outbox, enqueue_email
+from app.services.login_guard import HashQueueFull, HashTimeout, login_guard
 import os
 from datetime import datetime
 
@@ -34,14 +35,13 @@ def register():
     admin.generate_otp()
 
     try:
-        msg = Message('Your Verification Code',
-                      sender=os.environ.get('MAIL_FROM'),
-                      recipients=[email])
-        msg.body = f'Your verification code is: {admin.otp}'
-        mail.send(msg)
-        
         db.session.add(admin)
+        enqueue_email('Your Verification Code',
+                      sender=os.environ.get('MAIL_FROM'),
+                      recipients=[email],
+                      body=f'Your verification code is: {admin.otp}')
         db.session.commit()
+        email_outbox.wake()
         
         return jsonify({'message': 'Registration successful. Please check your email for the verification code.'}), 201
     except Exception as e:
@@ -77,6 +77,11 @@ def login():
     username = data.get('username')
     password = data.get('password')
 
+    # Throttle before touching the database or bcrypt
+    retry_after = login_guard.throttle(request.remote_addr, username)
+    if retry_after is not None:
+        return jsonify({'error': 'Too many login attempts. Please try again later.'}), 429, {'Retry-After': str(retry_after)}
+
     admin = Admin.query.filter_by(username=username).first()
 
     if not admin:
@@ -85,7 +90,12 @@ def login():
     if not admin.is_verified:
         return jsonify({'error': 'Account not verified. Please complete the setup process.'}), 403
 
-    if admin.check_password(password):
+    try:
+        password_ok = login_guard.check_password(admin.password_hash, password)
+    except (HashQueueFull, HashTimeout):
+        return jsonify({'error': 'Server busy. Please try again shortly.'}), 503, {'Retry-After': '1'}
+
+    if password_ok:
         # THE FIX: Convert the integer ID to a string
         access_token = create_access_token(identity=str(admin.id))
         return jsonify(access_token=access_token)
@@ -1,84 +1,123 @@
-from flask import Blueprint, jsonify, request, current_app, Response
-from app.models.blog import Post, Readlist, Category, PostReadlistOrder
+from flask import Blueprint, jsonify, request, current_app, Response, abort
+from app.models.blog import Post, Readlist, Category, RelatedPost
+from app.models.media import UploadedImage
 from app import db
+from app.services.cache import cached, invalidates
+from app.services.view_counter import view_counter
+from app.services.rate_limit import rate_limit
+from app.services.search import search_index, search_posts as run_search
+from app.services.related import posts_referencing, refresh_related_posts, related_refresher
+from app.services.pagination import keyset_paginate
+from app.services.readlist_sync import sync_post_readlists, sync_readlist_posts
+from app.services.reorder import order_response, reorder_response
+from app.services.feed import render_rss
+from app.services.change_stamps import last_changed, touch
+from app.services.images import ALLOWED_EXTENSIONS, UploadTooLarge, image_processor, save_upload
 from flask_jwt_extended import jwt_required
-from sqlalchemy import func
-import random
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased, joinedload, load_only, undefer
 import os
 from werkzeug.utils import secure_filename
-import time
+from datetime import datetime, timezone
 
 blog_bp = Blueprint('blog_bp', __name__)
 
+# Stable newest-first sort key used by cursor pagination; backed by the composite post indexes
+POST_CURSOR_COLUMNS = (Post.date_posted, Post.id)
+
 # --- Public Routes ---
 @blog_bp.route('/home-data', methods=['GET'])
+@cached('post', 'readlist', 'category')
 def get_blog_home_data():
     page = request.args.get('page', 1, type=int)
     per_page = 10 
-    featured_post = Post.query.filter_by(is_featured=True).order_by(Post.date_posted.desc()).first()
-    posts_query = Post.query.filter(Post.is_featured == False, Post.id != (featured_post.id if featured_post else None)).order_by(Post.date_posted.desc())
-    paginated_posts = posts_query.paginate(page=page, per_page=per_page, error_out=False)
+    featured_post = Post.query.filter_by(is_featured=True).order_by(Post.date_posted.desc(), Post.id.desc()).first()
+    posts_query = Post.query.filter(Post.is_featured == False, Post.id != (featured_post.id if featured_post else None))
+    # ?cursor= opts into keyset pagination; page numbers stay the default for existing clients
+    if 'cursor' in request.args:
+        try:
+            posts, pagination = keyset_paginate(posts_query, POST_CURSOR_COLUMNS, request.args['cursor'], per_page)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    else:
+        paginated_posts = posts_query.order_by(Post.date_posted.desc(), Post.id.desc()).paginate(page=page, per_page=per_page, error_out=False)
+        posts = paginated_posts.items
+        pagination = { 'page': paginated_posts.page, 'totalPages': paginated_posts.pages, 'hasNext': paginated_posts.has_next, 'hasPrev': paginated_posts.has_prev }
     readlists = Readlist.query.order_by(Readlist.order.asc()).all()
     
     return jsonify({
         'featuredPost': featured_post.to_dict() if featured_post else None,
-        'posts': [post.to_dict() for post in paginated_posts.items],
+        'posts': [post.to_dict() for post in posts],
         'readlists': [readlist.to_dict() for readlist in readlists],
-        'pagination': { 'page': paginated_posts.page, 'totalPages': paginated_posts.pages, 'hasNext': paginated_posts.has_next, 'hasPrev': paginated_posts.has_prev }
+        'pagination': pagination
     })
 
 @blog_bp.route('/readlists', methods=['GET'])
+@cached('readlist', 'post', 'category')
 def get_all_public_readlists():
-    readlists = Readlist.query.order_by(Readlist.order.asc()).all()
+    readlists = Readlist.with_posts().order_by(Readlist.order.asc()).all()
     return jsonify([rl.to_dict(include_posts=True) for rl in readlists])
 
 @blog_bp.route('/search', methods=['GET'])
 def search_posts():
-    query = request.args.get('q', '', type=str)
-    if not query:
-        return jsonify([])
-    
-    posts = Post.query.filter(
-        Post.title.ilike(f'%{query}%') | Post.excerpt.ilike(f'%{query}%')
-    ).order_by(Post.date_posted.desc()).limit(20).all()
-    
-    return jsonify([p.to_dict() for p in posts])
+    query = request.args.get('q', '', type=str).strip()
+    page = request.args.get('page', type=int)
+    per_page = min(max(request.args.get('per_page', 10, type=int), 1), 50)
+    # Without ?page= the endpoint keeps its original shape: a bare list of the top 20 hits
+    offset, limit = ((max(page, 1) - 1) * per_page, per_page) if page else (0, 20)
+
+    total, hits = run_search(query, offset, limit) if query else (0, [])
+    posts = {p.id: p for p in Post.query.options(joinedload(Post.category)).filter(Post.id.in_([h[0] for h in hits]))} if hits else {}
+    results = []
+    for post_id, score, snippet in hits:
+        if post_id in posts:
+            results.append(dict(posts[post_id].to_dict(), snippet=snippet, score=round(score, 4)))
+
+    if not page:
+        return jsonify(results)
+    total_pages = -(-total // per_page)
+    return jsonify({
+        'results': results,
+        'pagination': { 'page': page, 'perPage': per_page, 'total': total, 'totalPages': total_pages, 'hasNext': page < total_pages, 'hasPrev': page > 1 }
+    })
 
 @blog_bp.route('/posts/<string:slug>', methods=['GET'])
 def get_post(slug):
-    post = Post.query.filter_by(slug=slug).first_or_404()
-    return jsonify(post.to_dict())
+    post = Post.query.options(undefer(Post.content)).filter_by(slug=slug).first_or_404()
+    return jsonify(post.to_dict(include_content=True))
 
 @blog_bp.route('/posts/<string:slug>/related', methods=['GET'])
 def get_related_content(slug):
-    current_post = Post.query.filter_by(slug=slug).first_or_404()
-    prev_post = Post.query.filter(Post.date_posted < current_post.date_posted).order_by(Post.date_posted.desc()).first()
-    next_post = Post.query.filter(Post.date_posted > current_post.date_posted).order_by(Post.date_posted.asc()).first()
-    more_in_category = []
-    if current_post.category:
-        more_in_category = Post.query.filter(Post.category_id == current_post.category_id, Post.id != current_post.id).order_by(func.rand()).limit(2).all()
-    in_this_series = []
-    readlist_ids = [assoc.readlist_id for assoc in current_post.readlist_associations]
-    if readlist_ids:
-        all_related_posts = Post.query.join(PostReadlistOrder).filter(PostReadlistOrder.readlist_id.in_(readlist_ids), Post.id != current_post.id).distinct().all()
-        random.shuffle(all_related_posts)
-        in_this_series = all_related_posts[:2]
+    # Served from the precomputed post_related table (see app.services.related) in one query
+    current_post = aliased(Post)
+    rows = RelatedPost.query.join(current_post, RelatedPost.post_id == current_post.id).filter(current_post.slug == slug)\
+        .options(joinedload(RelatedPost.related).joinedload(Post.category)).order_by(RelatedPost.rank.asc()).all()
+    if not rows:
+        Post.query.filter_by(slug=slug).first_or_404()
+        # Nothing computed yet (fresh deploy or brand-new post): make sure the refresher is running
+        related_refresher.ensure_started()
+        related_refresher.wake()
+    related = {'previous': [], 'next': [], 'category': [], 'series': []}
+    for row in rows:
+        related[row.kind].append(row.related.to_dict())
 
     return jsonify({
-        'previousPost': prev_post.to_dict() if prev_post else None, 'nextPost': next_post.to_dict() if next_post else None,
-        'moreInCategory': [p.to_dict() for p in more_in_category], 'inThisSeries': [p.to_dict() for p in in_this_series]
+        'previousPost': related['previous'][0] if related['previous'] else None, 'nextPost': related['next'][0] if related['next'] else None,
+        'moreInCategory': related['category'], 'inThisSeries': related['series']
     })
 
 @blog_bp.route('/posts/<string:slug>/view', methods=['POST'])
+@rate_limit('post_view')
 def increment_view_count(slug):
-    post = Post.query.filter_by(slug=slug).first_or_404()
-    post.view_count += 1
-    db.session.commit()
+    # Buffered in memory and flushed as batched `view_count = view_count + n` updates
+    if not view_counter.record(slug):
+        abort(404)
     return jsonify({'message': 'View count updated.'})
 
 @blog_bp.route('/readlists/<string:slug>', methods=['GET'])
 def get_readlist(slug):
-    readlist = Readlist.query.filter_by(slug=slug).first_or_404()
+    readlist = Readlist.with_posts().filter_by(slug=slug).first_or_404()
     return jsonify(readlist.to_dict(include_posts=True))
     
 @blog_bp.route('/categories', methods=['GET'])
@@ -87,47 +126,97 @@ def get_all_public_categories():
     return jsonify([c.to_dict() for c in categories])
 
 @blog_bp.route('/categories/<string:slug>', methods=['GET'])
+@cached('category', 'post')
 def get_category_page(slug):
     category = Category.query.filter_by(slug=slug).first_or_404()
-    posts = Post.query.filter_by(category_id=category.id).order_by(Post.date_posted.desc()).all()
-    return jsonify({'category': category.to_dict(), 'posts': [p.to_dict() for p in posts]})
+    posts_query = Post.query.filter_by(category_id=category.id)
+    if 'cursor' not in request.args:
+        posts = posts_query.order_by(Post.date_posted.desc(), Post.id.desc()).all()
+        return jsonify({'category': category.to_dict(), 'posts': [p.to_dict() for p in posts]})
+
+    per_page = min(max(request.args.get('per_page', 10, type=int), 1), 50)
+    try:
+        posts, pagination = keyset_paginate(posts_query, POST_CURSOR_COLUMNS, request.args['cursor'], per_page)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'category': category.to_dict(), 'posts': [p.to_dict() for p in posts], 'pagination': pagination})
 
 
 # --- Admin Routes ---
 @blog_bp.route('/upload-image', methods=['POST'])
 @jwt_required()
 def upload_blog_image():
+    max_bytes = current_app.config['UPLOAD_MAX_BYTES']
+    # Reject oversized bodies before Werkzeug spools the multipart form to disk
+    if request.content_length and request.content_length > max_bytes + 64 * 1024:
+        return jsonify({'error': 'File is too large.'}), 413
     if 'file' not in request.files:
         return jsonify({'error': 'No file part'}), 400
     file = request.files['file']
     if file.filename == '':
         return jsonify({'error': 'No selected file'}), 400
-    
+
+    filename = secure_filename(file.filename)
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if extension not in ALLOWED_EXTENSIONS:
+        return jsonify({'error': 'Unsupported image type.'}), 400
+    extension = 'jpg' if extension == 'jpeg' else extension
+
     try:
-        filename = secure_filename(file.filename)
-        unique_filename = f"{int(time.time())}_{filename}"
-        
-        upload_folder = os.path.join(current_app.root_path, 'static', 'uploads')
-        if not os.path.exists(upload_folder):
-            os.makedirs(upload_folder)
-            
-        file_path = os.path.join(upload_folder, unique_filename)
-        file.save(file_path)
-
-        file_url = f"/static/uploads/{unique_filename}"
-        
-        return jsonify({'url': file_url})
+        content_hash, size = save_upload(file.stream, image_processor.upload_folder, extension, max_bytes)
+    except UploadTooLarge as e:
+        return jsonify({'error': str(e)}), 413
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+    image = UploadedImage.query.filter_by(content_hash=content_hash).first()
+    if image is None:
+        image = UploadedImage(content_hash=content_hash, extension=extension, size_bytes=size, status='pending')
+        db.session.add(image)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # The same bytes were uploaded concurrently; use the row that won
+            db.session.rollback()
+            image = UploadedImage.query.filter_by(content_hash=content_hash).first()
+        else:
+            # Committed as pending before the worker can see it, so its ready/failed is never overwritten
+            if not image_processor.submit(image.id):
+                image.status = 'original'
+                db.session.commit()
+    elif image.extension != extension:
+        os.remove(os.path.join(image_processor.upload_folder, f"{content_hash}.{extension}"))
+    if image.status in ('original', 'failed') or image_processor.is_stale(image):
+        previous_status = image.status
+        image.status, image.queued_at = 'pending', datetime.utcnow()
+        db.session.commit()
+        if not image_processor.submit(image.id):
+            # A lost job is not retried again until the next upload; serve the original meanwhile
+            image.status = 'original' if previous_status == 'pending' else previous_status
+            db.session.commit()
+
+    data = image.to_dict()
+    if image.status == 'pending':
+        data['variants'] = image_processor.variant_urls(content_hash)
+    return jsonify(data)
+
 @blog_bp.route('/admin/posts', methods=['GET'])
 @jwt_required()
 def get_all_posts_admin():
-    posts = Post.query.order_by(Post.date_posted.desc()).all()
-    return jsonify([p.to_dict(include_readlists=True) for p in posts])
+    if 'cursor' not in request.args:
+        posts = Post.query.order_by(Post.date_posted.desc(), Post.id.desc()).all()
+        return jsonify([p.to_dict(include_readlists=True) for p in posts])
+
+    per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
+    try:
+        posts, pagination = keyset_paginate(Post.query, POST_CURSOR_COLUMNS, request.args['cursor'], per_page)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'posts': [p.to_dict(include_readlists=True) for p in posts], 'pagination': pagination})
 
 @blog_bp.route('/admin/posts', methods=['POST'])
 @jwt_required()
+@invalidates('post')
 def create_post():
     data = request.get_json()
     new_post = Post(
@@ -136,65 +225,76 @@ def create_post():
         is_featured=data.get('is_featured', False), category_id=data.get('category_id')
     )
     db.session.add(new_post)
-    db.session.commit()
+    db.session.flush()
     if 'readlist_ids' in data:
-        for rl_id in data['readlist_ids']:
-            readlist = Readlist.query.get(rl_id)
-            if readlist:
-                assoc = PostReadlistOrder(post=new_post, readlist=readlist)
-                db.session.add(assoc)
-        db.session.commit()
-    return jsonify(new_post.to_dict()), 201
+        sync_post_readlists(new_post, data['readlist_ids'])
+    touch('feed')
+    db.session.commit()
+    search_index.index_post(new_post)
+    refresh_related_posts([new_post.id], content_changed=True)
+    return jsonify(new_post.to_dict(include_content=True)), 201
 
 @blog_bp.route('/admin/posts/<int:post_id>', methods=['GET'])
 @jwt_required()
 def get_post_admin(post_id):
-    post = Post.query.get_or_404(post_id)
-    return jsonify(post.to_dict(include_readlists=True))
+    post = Post.query.options(undefer(Post.content)).get_or_404(post_id)
+    return jsonify(post.to_dict(include_readlists=True, include_content=True))
 
 @blog_bp.route('/admin/posts/<int:post_id>', methods=['PUT'])
 @jwt_required()
+@invalidates('post')
 def update_post(post_id):
-    post = Post.query.get_or_404(post_id)
+    post = Post.query.options(undefer(Post.content)).get_or_404(post_id)
     data = request.get_json()
+    old_slug = post.slug
     post.title = data.get('title', post.title); post.slug = data.get('slug', post.slug)
     post.content = data.get('content', post.content); post.excerpt = data.get('excerpt', post.excerpt)
     post.image_url = data.get('image_url', post.image_url); post.is_featured = data.get('is_featured', post.is_featured)
     post.category_id = data.get('category_id', post.category_id)
     
     if 'readlist_ids' in data:
-        PostReadlistOrder.query.filter_by(post_id=post.id).delete()
-        for rl_id in data['readlist_ids']:
-            readlist = Readlist.query.get(rl_id)
-            if readlist:
-                assoc = PostReadlistOrder(post=post, readlist=readlist)
-                db.session.add(assoc)
+        sync_post_readlists(post, data['readlist_ids'])
 
+    touch('feed')
     db.session.commit()
-    return jsonify(post.to_dict(include_readlists=True))
+    if post.slug != old_slug:
+        view_counter.forget(old_slug)
+    search_index.index_post(post)
+    refresh_related_posts([post.id], content_changed=True)
+    return jsonify(post.to_dict(include_readlists=True, include_content=True))
 
 @blog_bp.route('/admin/posts/<int:post_id>', methods=['DELETE'])
 @jwt_required()
+@invalidates('post')
 def delete_post(post_id):
     post = Post.query.get_or_404(post_id)
+    referrers = posts_referencing([post_id])
+    # What ON DELETE CASCADE does on MySQL, done here too so no database serves rows pointing at the
+    # deleted post while the referrers wait for the background refresh
+    RelatedPost.query.filter(or_(RelatedPost.post_id == post_id, RelatedPost.related_post_id == post_id)).delete(synchronize_session=False)
     db.session.delete(post)
+    touch('feed')
     db.session.commit()
+    view_counter.forget(post.slug)
+    search_index.remove_post(post_id)
+    refresh_related_posts([post_id], also_refresh=referrers)
     return jsonify({'message': 'Post deleted successfully'})
 
 @blog_bp.route('/admin/readlists', methods=['GET'])
 @jwt_required()
 def get_all_readlists_admin():
-    readlists = Readlist.query.order_by(Readlist.order.asc()).all()
+    readlists = Readlist.with_posts().order_by(Readlist.order.asc()).all()
     return jsonify([rl.to_dict(include_posts=True) for rl in readlists])
 
 @blog_bp.route('/admin/readlists/<int:readlist_id>', methods=['GET'])
 @jwt_required()
 def get_single_readlist_admin(readlist_id):
-    readlist = Readlist.query.get_or_404(readlist_id)
+    readlist = Readlist.with_posts().get_or_404(readlist_id)
     return jsonify(readlist.to_dict(include_posts=True))
 
 @blog_bp.route('/admin/readlists', methods=['POST'])
 @jwt_required()
+@invalidates('readlist')
 def create_readlist():
     data = request.get_json()
     new_readlist = Readlist(
@@ -205,8 +305,20 @@ def create_readlist():
     db.session.commit()
     return jsonify(new_readlist.to_dict()), 201
 
+@blog_bp.route('/admin/readlists/order', methods=['GET'])
+@jwt_required()
+def get_readlists_order():
+    return order_response(Readlist)
+
+@blog_bp.route('/admin/readlists/order', methods=['PUT'])
+@jwt_required()
+@invalidates('readlist')
+def reorder_readlists():
+    return reorder_response(Readlist, request.get_json(silent=True))
+
 @blog_bp.route('/admin/readlists/<int:readlist_id>', methods=['PUT'])
 @jwt_required()
+@invalidates('readlist')
 def update_readlist(readlist_id):
     readlist = Readlist.query.get_or_404(readlist_id)
     data = request.get_json()
@@ -214,23 +326,24 @@ def update_readlist(readlist_id):
     readlist.description = data.get('description', readlist.description); readlist.order = data.get('order', readlist.order)
     readlist.image_url = data.get('image_url', readlist.image_url)
     
+    changed_posts = set()
     if 'posts' in data:
-        PostReadlistOrder.query.filter_by(readlist_id=readlist.id).delete()
-        for i, post_data in enumerate(data['posts']):
-            post = Post.query.get(post_data['id'])
-            if post:
-                assoc = PostReadlistOrder(post=post, readlist=readlist, post_order=i)
-                db.session.add(assoc)
+        changed_posts = sync_readlist_posts(readlist, [post_data['id'] for post_data in data['posts']])
 
     db.session.commit()
-    return jsonify(readlist.to_dict(include_posts=True))
+    if changed_posts:
+        refresh_related_posts(changed_posts)
+    return jsonify(Readlist.with_posts().get(readlist_id).to_dict(include_posts=True))
 
 @blog_bp.route('/admin/readlists/<int:readlist_id>', methods=['DELETE'])
 @jwt_required()
+@invalidates('readlist')
 def delete_readlist(readlist_id):
     readlist = Readlist.query.get_or_404(readlist_id)
+    members = [assoc.post_id for assoc in readlist.post_associations]
     db.session.delete(readlist)
     db.session.commit()
+    refresh_related_posts(members)
     return jsonify({'message': 'Readlist deleted.'})
 
 @blog_bp.route('/admin/categories', methods=['GET'])
@@ -241,6 +354,7 @@ def get_categories():
 
 @blog_bp.route('/admin/categories', methods=['POST'])
 @jwt_required()
+@invalidates('category')
 def create_category():
     data = request.get_json()
     new_category = Category(name=data['name'], slug=data['slug'], color=data['color'])
@@ -250,58 +364,37 @@ def create_category():
 
 @blog_bp.route('/admin/categories/<int:cat_id>', methods=['DELETE'])
 @jwt_required()
+@invalidates('category')
 def delete_category(cat_id):
     category = Category.query.get_or_404(cat_id)
+    members = [post.id for post in category.posts]
     db.session.delete(category)
+    # Feed items carry their category name
+    touch('feed')
     db.session.commit()
+    # Category names are indexed with their posts, so rebuild on next search
+    search_index.invalidate()
+    refresh_related_posts(members)
     return jsonify({'message': 'Category deleted.'})
 
 
 # --- Dynamic RSS Feed ---
 @blog_bp.route('/rss.xml', methods=['GET'])
+@cached('post', 'category')
 def rss_feed():
-    """Generate a dynamic RSS feed from all published blog posts."""
-    from xml.sax.saxutils import escape
-    from datetime import timezone
-
-    posts = Post.query.order_by(Post.date_posted.desc()).all()
-
-    # Build date string for channel
-    if posts:
-        last_build = posts[0].date_posted.replace(tzinfo=timezone.utc).strftime('%a, %d %b %Y %H:%M:%S GMT')
-    else:
-        from datetime import datetime
-        last_build = datetime.now(timezone.utc).strftime('%a, %d %b %Y %H:%M:%S GMT')
-
-    items_xml = ""
-    for post in posts:
-        pub_date = post.date_posted.replace(tzinfo=timezone.utc).strftime('%a, %d %b %Y %H:%M:%S GMT')
-        post_url = f"https://bolaji.tech/blog/{post.slug}"
-        category_tag = ""
-        if post.category:
-            category_tag = f"\n    <category>{escape(post.category.name)}</category>"
-
-        items_xml += f"""
-  <item>
-    <title>{escape(post.title)}</title>
-    <link>{post_url}</link>
-    <description>{escape(post.excerpt or '')}</description>
-    <author>bolaji@bolaji.tech (Bolaji Durojaiye)</author>{category_tag}
-    <pubDate>{pub_date}</pubDate>
-    <guid>{post_url}</guid>
-  </item>"""
-
-    rss_xml = f"""<?xml version="1.0" encoding="UTF-8" ?>
-<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">
-<channel>
-  <title>Bolaji's Blog</title>
-  <link>https://bolaji.tech/blog</link>
-  <description>Thoughts, tutorials, and insights on software engineering, APIs, and building scalable systems — by Omobolaji Durojaiye.</description>
-  <language>en-us</language>
-  <lastBuildDate>{last_build}</lastBuildDate>
-  <atom:link href="https://bolaji.tech/api/blog/rss.xml" rel="self" type="application/rss+xml" />{items_xml}
-</channel>
-</rss>
-"""
-
-    return Response(rss_xml.strip(), mimetype='application/rss+xml')
\ No newline at end of file
+    """Generate a dynamic RSS feed from the latest published blog posts."""
+    posts = Post.query.options(
+        load_only(Post.title, Post.slug, Post.excerpt, Post.date_posted),
+        joinedload(Post.category).load_only(Category.name)
+    ).order_by(Post.date_posted.desc(), Post.id.desc()).limit(current_app.config['RSS_MAX_ITEMS']).all()
+
+    last_build = posts[0].date_posted if posts else datetime.utcnow()
+    response = Response(render_rss(posts, last_build), mimetype='application/rss+xml')
+    # The newest post date misses edits and moves backwards on deletes; the feed stamp is bumped by
+    # every post write, including deletes, and is the same for every worker
+    last_modified = last_changed('feed') or last_build
+    if posts and last_build > last_modified:
+        # A post dated ahead of its write shows up in the feed when that date arrives
+        last_modified = last_build
+    response.last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return response
@@ -1,54 +1,155 @@
-from flask import Blueprint, request, jsonify
-from app import db, mail
-from app.models.booking import Availability, Booking
-from flask_mail import Message
+from flask import Blueprint, request, jsonify, current_app
+from app import db
+from app.services.cache import cached, invalidates, response_cache
+from app.services.outbox import email_outbox, enqueue_email
+from app.services.rate_limit import rate_limit
+from app.services.pagination import date_range_filters, keyset_paginate
+from app.services.slots import claim_granules, expand_windows, free_slots, on_grid
+from app.models.booking import ACTIVE_BOOKING_STATUSES, Availability, Booking, BookingSlotClaim
 from flask_jwt_extended import jwt_required
-from datetime import datetime
+from sqlalchemy import and_, or_, select
+from sqlalchemy.exc import IntegrityError
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
 import os
 
 booking_bp = Blueprint('booking_bp', __name__)
 
+BOOKING_CURSOR_COLUMNS = (Booking.created_at, Booking.id)
+
 # --- Public Routes ---
 @booking_bp.route('/availability', methods=['GET'])
+@cached('availability')
 def get_availability():
     availabilities = Availability.query.all()
     return jsonify([a.to_dict() for a in availabilities])
 
+def _open_slots(first_day, last_day, duration):
+    """(slots, cache_hit): every free slot in the range, past ones included, cached until a booking
+    or availability write."""
+    def build():
+        windows = expand_windows(Availability.query.all(), first_day, last_day)
+        busy = []
+        if windows:
+            # Only bookings that can overlap the range; a meeting never runs longer than a day
+            bookings = Booking.query.filter(
+                Booking.status.in_(('Pending', 'Confirmed')),
+                Booking.meeting_time < windows[-1][1],
+                Booking.meeting_time >= windows[0][0] - timedelta(days=1)
+            ).with_entities(Booking.meeting_time, Booking.meeting_duration).all()
+            busy = [(start, start + timedelta(minutes=minutes)) for start, minutes in bookings]
+        step = timedelta(minutes=current_app.config['BOOKING_SLOT_STEP_MINUTES'])
+        return free_slots(windows, busy, timedelta(minutes=duration), step), 200, []
+
+    if current_app.config.get('RESPONSE_CACHE_DISABLED'):
+        return build()[0], False
+    entry, hit = response_cache.get_or_build(f"slots:{first_day}:{last_day}:{duration}", ('availability', 'booking'), build)
+    return entry['body'], hit
+
+@booking_bp.route('/slots', methods=['GET'])
+def get_slots():
+    # All times are UTC, like meeting_time
+    try:
+        today = datetime.utcnow().date()
+        first_day = datetime.strptime(request.args['from'], '%Y-%m-%d').date() if request.args.get('from') else today
+        last_day = datetime.strptime(request.args['to'], '%Y-%m-%d').date() if request.args.get('to') else first_day + timedelta(days=13)
+        duration = request.args.get('duration', 30, type=int)
+    except ValueError:
+        return jsonify({'error': 'from and to must be YYYY-MM-DD dates.'}), 400
+    if last_day < first_day or (last_day - first_day).days >= current_app.config['BOOKING_SLOTS_MAX_DAYS']:
+        return jsonify({'error': f"Date range must span 1 to {current_app.config['BOOKING_SLOTS_MAX_DAYS']} days."}), 400
+    if duration <= 0 or duration > 8 * 60:
+        return jsonify({'error': 'duration must be between 1 and 480 minutes.'}), 400
+
+    slots, hit = _open_slots(first_day, last_day, duration)
+    # Applied per request rather than cached, so a cached list never offers a slot that has started
+    slots = slots[bisect_left(slots, (datetime.utcnow(),)):]
+    response = jsonify({
+        'from': first_day.isoformat(),
+        'to': last_day.isoformat(),
+        'duration': duration,
+        'slots': [{'start': start.isoformat(), 'end': end.isoformat()} for start, end in slots]
+    })
+    response.headers['X-Cache'] = 'HIT' if hit else 'MISS'
+    return response
+
+def _release_dead_claims(slots):
+    """Delete claims that hold nothing any more: slots that have passed, and any of the given slots
+    whose booking is no longer active (its status was changed outside the app). Returns the count."""
+    inactive = select(Booking.id).where(or_(Booking.status.is_(None), Booking.status.notin_(ACTIVE_BOOKING_STATUSES)))
+    return BookingSlotClaim.query.filter(or_(
+        BookingSlotClaim.slot_start < datetime.utcnow(),
+        and_(BookingSlotClaim.slot_start.in_(slots), BookingSlotClaim.booking_id.in_(inactive))
+    )).delete(synchronize_session=False)
+
 @booking_bp.route('/bookings', methods=['POST'])
+@rate_limit('booking')
+@invalidates('booking')
 def create_booking():
     data = request.get_json()
     
     # THE FIX: Replace 'Z' with '+00:00' to make it compatible with fromisoformat
     iso_time_str = data['time'].replace('Z', '+00:00')
-    
-    new_booking = Booking(
-        client_name=data['name'], client_email=data['email'],
-        meeting_time=datetime.fromisoformat(iso_time_str),
-        meeting_duration=data['duration'], notes=data.get('notes')
-    )
-    db.session.add(new_booking)
-    db.session.commit()
+    meeting_time = datetime.fromisoformat(iso_time_str)
+    if meeting_time.tzinfo is not None:
+        meeting_time = meeting_time.astimezone(timezone.utc).replace(tzinfo=None)
+    duration = int(data['duration'])
+    if duration <= 0:
+        return jsonify({'error': 'duration must be a positive number of minutes.'}), 400
+    # Claims cover whole grid blocks, so only grid-aligned starts keep back-to-back bookings apart
+    step = timedelta(minutes=current_app.config['BOOKING_SLOT_STEP_MINUTES'])
+    if not on_grid(meeting_time, step):
+        return jsonify({'error': f"time must start on a {current_app.config['BOOKING_SLOT_STEP_MINUTES']}-minute slot boundary."}), 400
+    meeting_end = meeting_time + timedelta(minutes=duration)
 
-    try:
-        msg_admin = Message(
-            subject="New Booking Request",
-            recipients=[os.environ.get('MAIL_FROM')],
-            body=f"New booking request from {data['name']} ({data['email']}).\n"
-                 f"Time: {new_booking.meeting_time.strftime('%A, %B %d, %Y at %I:%M %p UTC')}\n"
-                 f"Duration: {data['duration']} minutes."
-        )
-        mail.send(msg_admin)
-        msg_client = Message(
-            subject="Your Booking Request is Received",
-            recipients=[data['email']],
-            body=f"Hi {data['name']},\n\nYour request for a {data['duration']}-minute session is received.\n"
-                 f"I will confirm the appointment and send a meeting link shortly.\n\n"
-                 f"Requested Time: {new_booking.meeting_time.strftime('%A, %B %d, %Y at %I:%M %p UTC')}\n\n"
-                 f"Best,\nBolaji"
+    # Fast path: indexed range scan on meeting_time for an existing overlapping booking
+    nearby = Booking.query.filter(
+        Booking.status.in_(('Pending', 'Confirmed')),
+        Booking.meeting_time < meeting_end,
+        Booking.meeting_time >= meeting_time - timedelta(days=1)
+    ).with_entities(Booking.meeting_time, Booking.meeting_duration).all()
+    if any(start + timedelta(minutes=minutes) > meeting_time for start, minutes in nearby):
+        return jsonify({'error': 'That time is no longer available.'}), 409
+
+    slots = claim_granules(meeting_time, meeting_end, step)
+    # Claims only guard slots still to come; those of meetings that have passed are dead weight
+    BookingSlotClaim.query.filter(BookingSlotClaim.slot_start < datetime.utcnow()).delete(synchronize_session=False)
+    for attempt in range(2):
+        new_booking = Booking(
+            client_name=data['name'], client_email=data['email'],
+            meeting_time=meeting_time,
+            meeting_duration=duration, notes=data.get('notes')
         )
-        mail.send(msg_client)
-    except Exception as e:
-        print(f"Mail sending failed for booking: {e}")
+        # The claim rows are what makes this atomic: a concurrent overlapping booking inserts the same
+        # slot_start and fails on the primary key, whichever database we run on
+        new_booking.claims = [BookingSlotClaim(slot_start=slot) for slot in slots]
+        db.session.add(new_booking)
+        try:
+            db.session.flush()
+            break
+        except IntegrityError:
+            db.session.rollback()
+            # The fast path found no active overlap, so the conflict may be claims left behind by a
+            # booking cancelled outside the app or by a past meeting; free those and try once more
+            if attempt or not _release_dead_claims(slots):
+                return jsonify({'error': 'That time is no longer available.'}), 409
+    enqueue_email(
+        subject="New Booking Request",
+        recipients=[os.environ.get('MAIL_FROM')],
+        body=f"New booking request from {data['name']} ({data['email']}).\n"
+             f"Time: {new_booking.meeting_time.strftime('%A, %B %d, %Y at %I:%M %p UTC')}\n"
+             f"Duration: {data['duration']} minutes."
+    )
+    enqueue_email(
+        subject="Your Booking Request is Received",
+        recipients=[data['email']],
+        body=f"Hi {data['name']},\n\nYour request for a {data['duration']}-minute session is received.\n"
+             f"I will confirm the appointment and send a meeting link shortly.\n\n"
+             f"Requested Time: {new_booking.meeting_time.strftime('%A, %B %d, %Y at %I:%M %p UTC')}\n\n"
+             f"Best,\nBolaji"
+    )
+    db.session.commit()
+    email_outbox.wake()
 
     return jsonify(new_booking.to_dict()), 201
 
@@ -61,6 +162,7 @@ def admin_get_availability():
 
 @booking_bp.route('/admin/availability', methods=['POST'])
 @jwt_required()
+@invalidates('availability')
 def admin_add_availability():
     data = request.get_json()
     new_avail = Availability(
@@ -74,6 +176,7 @@ def admin_add_availability():
 
 @booking_bp.route('/admin/availability/<int:avail_id>', methods=['DELETE'])
 @jwt_required()
+@invalidates('availability')
 def admin_delete_availability(avail_id):
     avail = Availability.query.get_or_404(avail_id)
     db.session.delete(avail)
@@ -83,5 +186,23 @@ def admin_delete_availability(avail_id):
 @booking_bp.route('/admin/bookings', methods=['GET'])
 @jwt_required()
 def admin_get_bookings():
-    bookings = Booking.query.order_by(Booking.created_at.desc()).all()
-    return jsonify([b.to_dict() for b in bookings])
\ No newline at end of file
+    query = Booking.query
+    if request.args.get('status'):
+        query = query.filter(Booking.status == request.args['status'])
+    try:
+        # from/to filter on the meeting date, served by ix_booking_status_meeting_time
+        query = query.filter(*date_range_filters(Booking.meeting_time, request.args))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # ?cursor= (empty for the first page) opts into pagination; without it the full list is returned
+    if 'cursor' not in request.args:
+        bookings = query.order_by(Booking.created_at.desc(), Booking.id.desc()).all()
+        return jsonify([b.to_dict() for b in bookings])
+
+    per_page = min(max(request.args.get('per_page', 25, type=int), 1), 100)
+    try:
+        bookings, pagination = keyset_paginate(query, BOOKING_CURSOR_COLUMNS, request.args['cursor'], per_page)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'bookings': [b.to_dict() for b in bookings], 'pagination': pagination})
\ No newline at end of file
@@ -1,11 +1,13 @@
 from flask import Blueprint, request, jsonify
-from flask_mail import Message
-from app import mail
+from app import db
+from app.services.outbox import email_outbox, enqueue_email
+from app.services.rate_limit import rate_limit
 import os
 
 contact_bp = Blueprint('contact_bp', __name__)
 
 @contact_bp.route('/contact', methods=['POST'])
+@rate_limit('contact')
 def send_contact_email():
     data = request.get_json()
     name = data.get('name')
@@ -16,12 +18,14 @@ def send_contact_email():
         return jsonify({'error': 'Missing required fields'}), 400
 
     try:
-        msg = Message(
+        enqueue_email(
             subject=f"New Portfolio Inquiry from {name}",
             recipients=[os.environ.get('MAIL_FROM')],
             body=f"Name: {name}\nEmail: {email}\n\nMessage:\n{message}"
         )
-        mail.send(msg)
+        db.session.commit()
+        email_outbox.wake()
         return jsonify({'message': 'Message sent successfully!'}), 200
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
@@ -1,21 +1,67 @@
 from flask import Blueprint, jsonify, request
-from app.models.product import Product, ProductCategory
+from app.models.product import Product, ProductCategory, ProductTag
 from app.models.order import ProductOrder
-from app import db, mail
-from flask_mail import Message
+from app import db
+from app.services.cache import cached, invalidates
+from app.services.outbox import email_outbox, enqueue_email
+from app.services.rate_limit import rate_limit
+from app.services.pagination import date_range_filters, keyset_paginate
+from app.services.sales_rollup import record_order, record_product_deleted, record_sale_change, sales_series
 from flask_jwt_extended import jwt_required
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+from datetime import datetime
 import os
 
 marketplace_bp = Blueprint('marketplace_bp', __name__)
 
+ORDER_CURSOR_COLUMNS = (ProductOrder.order_date, ProductOrder.id)
+
 # --- Public Routes ---
+PRODUCT_SORTS = {
+    'newest': (Product.id.desc(),),
+    'price_asc': (Product.price.asc(), Product.id.desc()),
+    'price_desc': (Product.price.desc(), Product.id.desc()),
+    'rating': (Product.rating.desc(), Product.id.desc())
+}
+
 @marketplace_bp.route('/products', methods=['GET'])
+@cached('product', 'product_category')
 def get_products():
-    products = Product.query.order_by(Product.id.desc()).all()
+    query = Product.query
+    if request.args.get('category'):
+        query = query.join(Product.category).filter(ProductCategory.slug == request.args['category'])
+    if request.args.get('tag'):
+        query = query.filter(Product.tag_rows.any(ProductTag.tag == request.args['tag']))
+    min_price, max_price = request.args.get('min_price', type=float), request.args.get('max_price', type=float)
+    if min_price is not None:
+        query = query.filter(Product.price >= min_price)
+    if max_price is not None:
+        query = query.filter(Product.price <= max_price)
+    if request.args.get('sold') in ('true', 'false'):
+        query = query.filter(Product.is_sold.is_(request.args['sold'] == 'true'))
+    sort = PRODUCT_SORTS.get(request.args.get('sort'), PRODUCT_SORTS['newest'])
+    # Categories come in the same query; tags in one batched SELECT for the whole page
+    products_query = query.options(joinedload(Product.category)).order_by(*sort)
     categories = ProductCategory.query.order_by(ProductCategory.name.asc()).all()
+
+    # Without ?page= the endpoint keeps its original shape: every matching product
+    page = request.args.get('page', type=int)
+    if not page:
+        return jsonify({
+            'products': [p.to_dict() for p in products_query.all()],
+            'categories': [c.to_dict() for c in categories]
+        })
+
+    page = max(page, 1)
+    per_page = min(max(request.args.get('per_page', 12, type=int), 1), 60)
+    total = query.order_by(None).count()
+    total_pages = -(-total // per_page)
+    products = products_query.offset((page - 1) * per_page).limit(per_page).all()
     return jsonify({
         'products': [p.to_dict() for p in products],
-        'categories': [c.to_dict() for c in categories]
+        'categories': [c.to_dict() for c in categories],
+        'pagination': { 'page': page, 'perPage': per_page, 'total': total, 'totalPages': total_pages, 'hasNext': page < total_pages, 'hasPrev': page > 1 }
     })
 
 @marketplace_bp.route('/products/<string:slug>', methods=['GET'])
@@ -24,6 +70,7 @@ def get_product_detail(slug):
     return jsonify(product.to_dict())
 
 @marketplace_bp.route('/orders', methods=['POST'])
+@rate_limit('order')
 def create_order():
     data = request.get_json()
     product = Product.query.get_or_404(data['product_id'])
@@ -33,15 +80,12 @@ def create_order():
         customer_phone=data.get('phone'), product_id=product.id
     )
     db.session.add(new_order)
+    record_order(new_order, product)
+    # Queued in the same transaction as the order and delivered by the background outbox worker
+    enqueue_email(subject=f"New Marketplace Order: {product.name}", recipients=[os.environ.get('MAIL_FROM')], body=f"You have a new order inquiry for '{product.name}'.\n\nCustomer Details:\nName: {data['name']}\nEmail: {data['email']}\nPhone: {data.get('phone', 'N/A')}\n\nYou can view this order in your admin dashboard.")
+    enqueue_email(subject="Your Order Inquiry has been received", recipients=[data['email']], body=f"Hi {data['name']},\n\nThank you for your interest in '{product.name}'.\n\nYour inquiry has been received, and I will get back to you shortly to discuss the next steps.\n\nBest,\nBolaji")
     db.session.commit()
-    
-    try:
-        msg_admin = Message(subject=f"New Marketplace Order: {product.name}", recipients=[os.environ.get('MAIL_FROM')], body=f"You have a new order inquiry for '{product.name}'.\n\nCustomer Details:\nName: {data['name']}\nEmail: {data['email']}\nPhone: {data.get('phone', 'N/A')}\n\nYou can view this order in your admin dashboard.")
-        mail.send(msg_admin)
-        msg_customer = Message(subject="Your Order Inquiry has been received", recipients=[data['email']], body=f"Hi {data['name']},\n\nThank you for your interest in '{product.name}'.\n\nYour inquiry has been received, and I will get back to you shortly to discuss the next steps.\n\nBest,\nBolaji")
-        mail.send(msg_customer)
-    except Exception as e:
-        print(f"Mail sending failed: {e}")
+    email_outbox.wake()
 
     return jsonify({'message': 'Order submitted successfully!'}), 201
 
@@ -49,21 +93,58 @@ def create_order():
 @marketplace_bp.route('/admin/stats', methods=['GET'])
 @jwt_required()
 def admin_get_stats():
-    sold_products = Product.query.filter_by(is_sold=True).all()
-    total_revenue = sum(p.price for p in sold_products)
-    apps_sold = len(sold_products)
+    total_revenue, apps_sold = db.session.query(func.coalesce(func.sum(Product.price), 0.0), func.count(Product.id)).filter(Product.is_sold.is_(True)).one()
     return jsonify({'total_revenue': total_revenue, 'apps_sold': apps_sold})
 
+@marketplace_bp.route('/admin/stats/daily', methods=['GET'])
+@jwt_required()
+def admin_get_daily_stats():
+    # Served from the sales_daily rollup, so any range costs at most one row per day and category
+    try:
+        last_day = datetime.strptime(request.args['to'], '%Y-%m-%d').date() if request.args.get('to') else datetime.utcnow().date()
+        first_day = datetime.strptime(request.args['from'], '%Y-%m-%d').date() if request.args.get('from') else last_day.replace(day=1)
+    except ValueError:
+        return jsonify({'error': 'from and to must be YYYY-MM-DD dates.'}), 400
+    if last_day < first_day or (last_day - first_day).days > 366 * 2:
+        return jsonify({'error': 'Date range must span 1 to 732 days.'}), 400
+    series = sales_series(first_day, last_day, request.args.get('category_id', type=int))
+    return jsonify({
+        'from': first_day.isoformat(),
+        'to': last_day.isoformat(),
+        'total_orders': sum(point['orders'] for point in series),
+        'total_sold': sum(point['sold'] for point in series),
+        'total_revenue': sum(point['revenue'] for point in series),
+        'series': series
+    })
+
 @marketplace_bp.route('/admin/orders', methods=['GET'])
 @jwt_required()
 def admin_get_orders():
-    orders = ProductOrder.query.order_by(ProductOrder.order_date.desc()).all()
-    return jsonify([o.to_dict() for o in orders])
+    # to_dict() only needs the product name; join it instead of one lazy load per order
+    query = ProductOrder.query.options(joinedload(ProductOrder.product).load_only(Product.name))
+    if request.args.get('status'):
+        query = query.filter(ProductOrder.status == request.args['status'])
+    try:
+        query = query.filter(*date_range_filters(ProductOrder.order_date, request.args))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # ?cursor= (empty for the first page) opts into pagination; without it the full list is returned
+    if 'cursor' not in request.args:
+        orders = query.order_by(ProductOrder.order_date.desc(), ProductOrder.id.desc()).all()
+        return jsonify([o.to_dict() for o in orders])
+
+    per_page = min(max(request.args.get('per_page', 25, type=int), 1), 100)
+    try:
+        orders, pagination = keyset_paginate(query, ORDER_CURSOR_COLUMNS, request.args['cursor'], per_page)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'orders': [o.to_dict() for o in orders], 'pagination': pagination})
 
 @marketplace_bp.route('/admin/products', methods=['GET'])
 @jwt_required()
 def admin_get_products():
-    products = Product.query.order_by(Product.id.desc()).all()
+    products = Product.query.options(joinedload(Product.category)).order_by(Product.id.desc()).all()
     return jsonify([p.to_dict() for p in products])
 
 def generate_slug(name):
@@ -71,6 +152,7 @@ def generate_slug(name):
 
 @marketplace_bp.route('/admin/products', methods=['POST'])
 @jwt_required()
+@invalidates('product')
 def admin_add_product():
     data = request.get_json()
     new_product = Product(
@@ -78,18 +160,22 @@ def admin_add_product():
         description=data['description'], features=data.get('features'), price=float(data['price']),
         image_url=data.get('image_url'), gallery_images=data.get('gallery_images'),
         product_url=data.get('product_url'), demo_url=data.get('demo_url'),
-        tags=data.get('tags'), is_sold=data.get('is_sold', False),
+        is_sold=data.get('is_sold', False),
         category_id=data.get('category_id') if data.get('category_id') else None
     )
+    new_product.set_tags(data.get('tags'))
     db.session.add(new_product)
+    record_sale_change(new_product, was_sold=False, old_price=None, old_category_id=None, old_sold_at=None)
     db.session.commit()
     return jsonify(new_product.to_dict()), 201
 
 @marketplace_bp.route('/admin/products/<int:prod_id>', methods=['PUT'])
 @jwt_required()
+@invalidates('product')
 def admin_update_product(prod_id):
     product = Product.query.get_or_404(prod_id)
     data = request.get_json()
+    was_sold, old_price, old_category_id, old_sold_at = product.is_sold, product.price, product.category_id, product.sold_at
     product.name = data.get('name', product.name)
     product.slug = generate_slug(data.get('name', product.name))
     product.subtitle = data.get('subtitle', product.subtitle)
@@ -100,16 +186,24 @@ def admin_update_product(prod_id):
     product.gallery_images = data.get('gallery_images', product.gallery_images)
     product.product_url = data.get('product_url', product.product_url)
     product.demo_url = data.get('demo_url', product.demo_url)
-    product.tags = data.get('tags', product.tags)
+    if 'tags' in data:
+        product.set_tags(data['tags'])
     product.is_sold = data.get('is_sold', product.is_sold)
     product.category_id = data.get('category_id') if data.get('category_id') else None
+    record_sale_change(product, was_sold, old_price, old_category_id, old_sold_at)
     db.session.commit()
     return jsonify(product.to_dict())
 
 @marketplace_bp.route('/admin/products/<int:prod_id>', methods=['DELETE'])
 @jwt_required()
+@invalidates('product')
 def admin_delete_product(prod_id):
     product = Product.query.get_or_404(prod_id)
+    # Orders reference the product and are counted in sales_daily, so it has to stay
+    if db.session.query(ProductOrder.query.filter_by(product_id=prod_id).exists()).scalar():
+        return jsonify({'error': 'This product has orders and cannot be deleted.'}), 409
+    # Keep the daily rollup in step with the all-time totals, which stop counting the product
+    record_product_deleted(product)
     db.session.delete(product)
     db.session.commit()
     return jsonify({'message': 'Product deleted'})
@@ -122,6 +216,7 @@ def admin_get_categories():
 
 @marketplace_bp.route('/admin/categories', methods=['POST'])
 @jwt_required()
+@invalidates('product_category')
 def admin_add_category():
     data = request.get_json()
     new_cat = ProductCategory(name=data['name'], slug=data['slug'])
@@ -131,6 +226,7 @@ def admin_add_category():
 
 @marketplace_bp.route('/admin/categories/<int:cat_id>', methods=['DELETE'])
 @jwt_required()
+@invalidates('product_category')
 def admin_delete_category(cat_id):
     category = ProductCategory.query.get_or_404(cat_id)
     db.session.delete(category)
@@ -0,0 +1,22 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required
+from app.services.view_counter import view_counter
+from app.services.outbox import email_outbox
+from app.services.spotify import spotify_client, spotify_poller
+from app.services.login_guard import login_guard
+from app.services.rate_limit import rate_limiter
+from app.services.related import related_refresher
+
+metrics_bp = Blueprint('metrics_bp', __name__)
+
+@metrics_bp.route('/', methods=['GET'])
+@jwt_required()
+def get_metrics():
+    return jsonify({
+        'view_counter': view_counter.stats(),
+        'email_outbox': email_outbox.stats(),
+        'spotify': dict(spotify_client.stats(), stream=spotify_poller.stats()),
+        'login': login_guard.stats(),
+        'rate_limit': rate_limiter.stats(),
+        'related_posts': related_refresher.stats()
+    })
@@ -1,23 +1,39 @@
 from flask import Blueprint, jsonify, request
 from app.models.project import Project
 from app import db
+from app.services.cache import cached, invalidates
+from app.services.project_index import project_index
+from app.services.reorder import order_response, reorder_response
 from flask_jwt_extended import jwt_required
 
 portfolio_bp = Blueprint('portfolio_bp', __name__)
 
+def facet_filters():
+    # ?tech=Flask&tech=React or ?tech=Flask,React; every value must match
+    return {
+        facet: [v for arg in request.args.getlist(param) for v in arg.split(',') if v.strip()]
+        for facet, param in (('tech_stack', 'tech'), ('tools', 'tool'))
+    }
+
 @portfolio_bp.route('/projects', methods=['GET'])
+@cached('project')
 def get_projects():
-    projects = Project.query.order_by(Project.order.asc()).all()
-    return jsonify([project.to_dict() for project in projects])
+    return jsonify(project_index.projects(facet_filters()))
+
+@portfolio_bp.route('/projects/facets', methods=['GET'])
+@cached('project')
+def get_project_facets():
+    return jsonify(project_index.facets(facet_filters()))
 
 @portfolio_bp.route('/projects/featured', methods=['GET'])
+@cached('project')
 def get_featured_projects():
     # Assuming 'order' field is used for featuring (lower numbers are higher priority)
-    projects = Project.query.order_by(Project.order.asc()).limit(4).all()
-    return jsonify([project.to_dict() for project in projects])
+    return jsonify(project_index.featured(limit=4))
 
 @portfolio_bp.route('/projects', methods=['POST'])
 @jwt_required()
+@invalidates('project')
 def add_project():
     data = request.get_json()
     new_project = Project(
@@ -30,10 +46,27 @@ def add_project():
     )
     db.session.add(new_project)
     db.session.commit()
+    project_index.invalidate()
     return jsonify(new_project.to_dict()), 201
 
+# --- Bulk reorder: GET the current ids + version, PUT them back in the new order ---
+@portfolio_bp.route('/projects/order', methods=['GET'])
+@jwt_required()
+def get_projects_order():
+    return order_response(Project)
+
+@portfolio_bp.route('/projects/order', methods=['PUT'])
+@jwt_required()
+@invalidates('project')
+def reorder_projects():
+    response = reorder_response(Project, request.get_json(silent=True))
+    if response.status_code == 200:
+        project_index.invalidate()
+    return response
+
 @portfolio_bp.route('/projects/<int:project_id>', methods=['PUT'])
 @jwt_required()
+@invalidates('project')
 def update_project(project_id):
     project = Project.query.get_or_404(project_id)
     data = request.get_json()
@@ -45,12 +78,15 @@ def update_project(project_id):
     project.cost = data.get('cost', project.cost); project.collaborators = data.get('collaborators', project.collaborators)
     project.order = data.get('order', project.order)
     db.session.commit()
+    project_index.invalidate()
     return jsonify(project.to_dict())
 
 @portfolio_bp.route('/projects/<int:project_id>', methods=['DELETE'])
 @jwt_required()
+@invalidates('project')
 def delete_project(project_id):
     project = Project.query.get_or_404(project_id)
     db.session.delete(project)
     db.session.commit()
+    project_index.invalidate()
     return jsonify({'message': 'Project deleted successfully'})
\ No newline at end of file
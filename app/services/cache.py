@@ -0,0 +1,155 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from functools import wraps
+
+from flask import current_app, make_response, request
+
+
+class ResponseCache:
+    """Bounded LRU of rendered GET responses, tagged by the models they were built from."""
+
+    def __init__(self, max_entries=512, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._tag_keys = defaultdict(set)
+        self._tag_generations = defaultdict(int)
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.max_entries = app.config.get('RESPONSE_CACHE_MAX_ENTRIES', self.max_entries)
+        self.ttl = app.config.get('RESPONSE_CACHE_TTL', self.ttl)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry['expires_at'] <= time.monotonic():
+                self._discard(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def get_or_build(self, key, tags, builder, ttl=None):
+        """Return the cached entry for key, running builder() at most once per cold key.
+
+        builder returns (body, status, headers); only 200 responses are stored.
+        """
+        entry = self.get(key)
+        if entry is not None:
+            return entry, True
+
+        with self._lock:
+            flight = self._inflight.setdefault(key, threading.Lock())
+        try:
+            with flight:
+                # Another request may have filled the key while we waited on the flight lock
+                entry = self.get(key)
+                if entry is not None:
+                    return entry, True
+                with self._lock:
+                    generations = {tag: self._tag_generations[tag] for tag in tags}
+                body, status, headers = builder()
+                entry = {'body': body, 'status': status, 'headers': headers}
+                if status == 200:
+                    self._store(key, entry, tags, generations, ttl)
+                return entry, False
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
+
+    def invalidate(self, *tags):
+        with self._lock:
+            for tag in tags:
+                self._tag_generations[tag] += 1
+                for key in list(self._tag_keys.pop(tag, ())):
+                    self._discard(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tag_keys.clear()
+            for tag in self._tag_generations:
+                self._tag_generations[tag] += 1
+
+    def _store(self, key, entry, tags, generations, ttl):
+        with self._lock:
+            # Skip the store if a write invalidated one of our tags while the response was being built
+            if any(self._tag_generations[tag] != gen for tag, gen in generations.items()):
+                return
+            self._discard(key)
+            entry['tags'] = tags
+            entry['expires_at'] = time.monotonic() + (ttl if ttl is not None else self.ttl)
+            self._entries[key] = entry
+            for tag in tags:
+                self._tag_keys[tag].add(key)
+            while len(self._entries) > self.max_entries:
+                self._discard(next(iter(self._entries)))
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry['tags']:
+            keys = self._tag_keys.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_keys[tag]
+
+
+response_cache = ResponseCache()
+
+
+def cached(*tags, ttl=None):
+    """Cache a public GET view by path + query string, tagged with the models it reads.
+
+    200s carry an ETag (and any Last-Modified the view set), so clients can revalidate, also
+    when the cache is disabled.
+    ttl may be a number of seconds or the name of a config key holding one.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != 'GET':
+                return view(*args, **kwargs)
+            if current_app.config.get('RESPONSE_CACHE_DISABLED'):
+                # Uncached, but clients can still revalidate against the same ETag/Last-Modified
+                response = make_response(view(*args, **kwargs))
+                if response.status_code == 200 and 'ETag' not in response.headers:
+                    response.set_etag(hashlib.sha1(response.get_data()).hexdigest())
+                return response.make_conditional(request)
+
+            def build():
+                response = make_response(view(*args, **kwargs))
+                body = response.get_data()
+                if response.status_code == 200 and 'ETag' not in response.headers:
+                    response.set_etag(hashlib.sha1(body).hexdigest())
+                return body, response.status_code, list(response.headers.items())
+
+            entry_ttl = current_app.config.get(ttl) if isinstance(ttl, str) else ttl
+            entry, hit = response_cache.get_or_build(request.full_path, tags, build, entry_ttl)
+            response = current_app.response_class(entry['body'], status=entry['status'], headers=entry['headers'])
+            response.headers['X-Cache'] = 'HIT' if hit else 'MISS'
+            # Turns into a bodyless 304 when If-None-Match / If-Modified-Since still match
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
+
+
+def invalidates(*tags):
+    """Evict cached responses tagged with any of tags once an admin write succeeds."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            response = make_response(view(*args, **kwargs))
+            if response.status_code < 400:
+                response_cache.invalidate(*tags)
+            return response
+        return wrapper
+    return decorator
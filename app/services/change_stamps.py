@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models.stamp import ChangeStamp
+
+
+def touch(name):
+    """Mark name as changed now, inside the caller's transaction."""
+    now = datetime.utcnow()
+    if db.session.execute(update(ChangeStamp).where(ChangeStamp.name == name).values(changed_at=now)).rowcount:
+        return
+    try:
+        # Savepoint so losing an insert race to another request does not roll back the caller's work
+        with db.session.begin_nested():
+            db.session.add(ChangeStamp(name=name, changed_at=now))
+    except IntegrityError:
+        db.session.execute(update(ChangeStamp).where(ChangeStamp.name == name).values(changed_at=now))
+
+
+def last_changed(name):
+    """The stamp for name, or None if nothing has recorded a change yet."""
+    return db.session.query(ChangeStamp.changed_at).filter(ChangeStamp.name == name).scalar()
@@ -0,0 +1,38 @@
+from xml.sax.saxutils import escape
+
+SITE_URL = "https://bolaji.tech"
+RSS_DATE_FORMAT = '%a, %d %b %Y %H:%M:%S GMT'
+
+
+def render_rss(posts, last_build):
+    """Yield the RSS document piece by piece; posts need title, slug, excerpt, date_posted and category."""
+    yield f"""<?xml version="1.0" encoding="UTF-8" ?>
+<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">
+<channel>
+  <title>Bolaji's Blog</title>
+  <link>{SITE_URL}/blog</link>
+  <description>Thoughts, tutorials, and insights on software engineering, APIs, and building scalable systems — by Omobolaji Durojaiye.</description>
+  <language>en-us</language>
+  <lastBuildDate>{last_build.strftime(RSS_DATE_FORMAT)}</lastBuildDate>
+  <atom:link href="{SITE_URL}/api/blog/rss.xml" rel="self" type="application/rss+xml" />"""
+
+    for post in posts:
+        pub_date = post.date_posted.strftime(RSS_DATE_FORMAT)
+        post_url = f"{SITE_URL}/blog/{post.slug}"
+        category_tag = ""
+        if post.category:
+            category_tag = f"\n    <category>{escape(post.category.name)}</category>"
+
+        yield f"""
+  <item>
+    <title>{escape(post.title)}</title>
+    <link>{post_url}</link>
+    <description>{escape(post.excerpt or '')}</description>
+    <author>bolaji@bolaji.tech (Bolaji Durojaiye)</author>{category_tag}
+    <pubDate>{pub_date}</pubDate>
+    <guid>{post_url}</guid>
+  </item>"""
+
+    yield """
+</channel>
+</rss>"""
@@ -0,0 +1,62 @@
+import threading
+import time
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from app import db
+from app.models.admin import Admin
+
+
+class AdminIdentityCache:
+    """TTL cache of admin rows keyed by JWT identity, so protected routes skip the lookup query.
+
+    Entries are dropped whenever an Admin is updated or deleted in this process; other worker
+    processes see the change once their entry expires. A ttl of 0 disables caching.
+    """
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._listening = False
+
+    def init_app(self, app):
+        self.ttl = app.config.get('ADMIN_IDENTITY_CACHE_TTL', self.ttl)
+        if not self._listening:
+            event.listen(Admin, 'after_update', self._on_change)
+            event.listen(Admin, 'after_delete', self._on_change)
+            self._listening = True
+
+    def load(self, identity):
+        if not self.ttl:
+            return db.session.get(Admin, identity)
+
+        key = str(identity)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            admin = Admin(**entry[1])
+            make_transient_to_detached(admin)
+            # load=False attaches the cached state without a SELECT
+            return db.session.merge(admin, load=False)
+
+        admin = db.session.get(Admin, identity)
+        if admin is not None:
+            columns = {attr.key: getattr(admin, attr.key) for attr in inspect(Admin).column_attrs}
+            with self._lock:
+                self._entries[key] = (time.monotonic() + self.ttl, columns)
+        return admin
+
+    def invalidate(self, identity=None):
+        with self._lock:
+            if identity is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(str(identity), None)
+
+    def _on_change(self, mapper, connection, target):
+        self.invalidate(target.id)
+
+
+admin_identity_cache = AdminIdentityCache()
@@ -0,0 +1,137 @@
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from app import db
+from app.models.media import UploadedImage
+
+try:
+    from PIL import Image, ImageOps
+except ImportError: # Pillow is optional; without it only originals are stored
+    Image = None
+
+ALLOWED_EXTENSIONS = {'jpg', 'jpeg', 'png', 'gif', 'webp'}
+CHUNK_SIZE = 64 * 1024
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+def save_upload(stream, upload_folder, extension, max_bytes):
+    """Stream an upload to disk in chunks, naming it by its sha256 so duplicates collapse.
+
+    Returns (content_hash, size_bytes); raises UploadTooLarge past max_bytes.
+    """
+    os.makedirs(upload_folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=upload_folder, suffix='.part')
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"File exceeds the {max_bytes} byte upload limit.")
+                digest.update(chunk)
+                out.write(chunk)
+
+        content_hash = digest.hexdigest()
+        final_path = os.path.join(upload_folder, f"{content_hash}.{extension}")
+        if os.path.exists(final_path):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, final_path)
+        return content_hash, size
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ImageProcessor:
+    """Bounded thread pool that writes resized WebP variants of uploaded images."""
+
+    def __init__(self):
+        self.widths = (480, 960, 1600)
+        self.max_workers = 2
+        self.queue_limit = 16
+        self.pending_timeout = 600
+        self.upload_folder = None
+        self._app = None
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self._app = app
+        self.widths = tuple(app.config.get('IMAGE_VARIANT_WIDTHS', self.widths))
+        self.max_workers = app.config.get('IMAGE_WORKERS', self.max_workers)
+        self.queue_limit = app.config.get('IMAGE_QUEUE_LIMIT', self.queue_limit)
+        self.pending_timeout = app.config.get('IMAGE_PENDING_TIMEOUT', self.pending_timeout)
+        self.upload_folder = app.config.get('UPLOAD_FOLDER') or os.path.join(app.root_path, 'static', 'uploads')
+
+    @property
+    def available(self):
+        return Image is not None
+
+    def variant_urls(self, content_hash):
+        return {str(width): f"/static/uploads/{content_hash}_w{width}.webp" for width in self.widths}
+
+    def is_stale(self, image):
+        """Pending past the timeout: its in-memory job was lost to a restart or crash."""
+        if image.status != 'pending':
+            return False
+        return image.queued_at is None or image.queued_at < datetime.utcnow() - timedelta(seconds=self.pending_timeout)
+
+    def submit(self, image_id):
+        """Queue variant generation; returns False when Pillow is missing or the queue is full."""
+        if not self.available:
+            return False
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='image-variants')
+                self._slots = threading.BoundedSemaphore(self.queue_limit)
+        if not self._slots.acquire(blocking=False):
+            return False
+        future = self._executor.submit(self._process, image_id)
+        future.add_done_callback(lambda _: self._slots.release())
+        return True
+
+    def _process(self, image_id):
+        with self._app.app_context():
+            image = db.session.get(UploadedImage, image_id)
+            if image is None:
+                return
+            try:
+                with Image.open(os.path.join(self.upload_folder, image.filename)) as source:
+                    source = ImageOps.exif_transpose(source)
+                    image.width, image.height = source.size
+                    if source.mode not in ('RGB', 'RGBA'):
+                        source = source.convert('RGBA' if 'transparency' in source.info or source.mode in ('LA', 'P') else 'RGB')
+                    for width in self.widths:
+                        variant = source.copy()
+                        # Never upscale: narrow originals get a same-size WebP under every width
+                        variant.thumbnail((width, width * 10))
+                        self._save_webp(variant, f"{image.content_hash}_w{width}.webp")
+                image.variants = self.variant_urls(image.content_hash)
+                image.status = 'ready'
+            except Exception as e:
+                print(f"Image variant generation failed for {image.filename}: {e}")
+                image.status = 'failed'
+            db.session.commit()
+
+    def _save_webp(self, variant, filename):
+        final_path = os.path.join(self.upload_folder, filename)
+        tmp_path = final_path + '.part'
+        variant.save(tmp_path, 'WEBP', quality=80, method=4)
+        os.replace(tmp_path, final_path)
+
+
+image_processor = ImageProcessor()
@@ -0,0 +1,110 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from app import bcrypt
+
+
+class TokenBuckets:
+    """Per-key token buckets: `capacity` attempts up front, refilled at `per_minute`.
+
+    Keys are kept in an LRU capped at max_keys so a spray of distinct keys cannot grow memory.
+    """
+
+    def __init__(self, capacity, per_minute, max_keys=10000):
+        self.capacity = capacity
+        self.per_minute = per_minute
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key):
+        """Spend one token for key; returns (allowed, retry_after_seconds)."""
+        now = time.monotonic()
+        rate = self.per_minute / 60.0
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        if allowed:
+            return True, 0
+        return False, math.ceil((1 - tokens) / rate) if rate else 60
+
+
+class HashQueueFull(Exception):
+    pass
+
+
+class HashTimeout(Exception):
+    pass
+
+
+class LoginGuard:
+    """Throttles login attempts and runs bcrypt checks on a small bounded pool.
+
+    Attempts are charged to the client IP and the username before any hashing, and at most
+    max_workers + queue_limit password checks are in flight per process.
+    """
+
+    def __init__(self):
+        self.max_workers = 2
+        self.queue_limit = 8
+        self.timeout = 10
+        self.by_ip = TokenBuckets(capacity=10, per_minute=5)
+        self.by_username = TokenBuckets(capacity=5, per_minute=2)
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+        self._stats = {'password_checks': 0, 'rejected_ip': 0, 'rejected_username': 0, 'rejected_queue_full': 0, 'timed_out': 0}
+
+    def init_app(self, app):
+        self.max_workers = app.config.get('BCRYPT_WORKERS', self.max_workers)
+        self.queue_limit = app.config.get('BCRYPT_QUEUE_LIMIT', self.queue_limit)
+        self.by_ip = TokenBuckets(app.config.get('LOGIN_IP_BURST', 10), app.config.get('LOGIN_IP_PER_MINUTE', 5))
+        self.by_username = TokenBuckets(app.config.get('LOGIN_USERNAME_BURST', 5), app.config.get('LOGIN_USERNAME_PER_MINUTE', 2))
+
+    def stats(self):
+        return dict(self._stats)
+
+    def throttle(self, ip, username):
+        """Returns seconds to wait when the attempt is over either limit, else None."""
+        allowed, retry_after = self.by_ip.take(ip)
+        if not allowed:
+            self._stats['rejected_ip'] += 1
+            return retry_after
+        allowed, retry_after = self.by_username.take((username or '').lower())
+        if not allowed:
+            self._stats['rejected_username'] += 1
+            return retry_after
+        return None
+
+    def check_password(self, password_hash, password):
+        """bcrypt check on the pool; raises HashQueueFull instead of queueing without bound, and
+        HashTimeout when the check does not finish within timeout seconds."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='bcrypt')
+                self._slots = threading.BoundedSemaphore(self.max_workers + self.queue_limit)
+        if not self._slots.acquire(blocking=False):
+            self._stats['rejected_queue_full'] += 1
+            raise HashQueueFull()
+        self._stats['password_checks'] += 1
+        future = self._executor.submit(bcrypt.check_password_hash, password_hash, password)
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            # Still queued behind slow checks: drop it rather than hash for a client that has gone
+            future.cancel()
+            self._stats['timed_out'] += 1
+            raise HashTimeout()
+
+
+login_guard = LoginGuard()
@@ -0,0 +1,112 @@
+import uuid
+from datetime import datetime, timedelta
+
+from flask_mail import Message
+from sqlalchemy import func, select, update
+
+from app import db, mail
+from app.models.outbox import OutboxEmail
+from app.services.worker import BackgroundWorker
+
+
+def enqueue_email(subject, recipients, body, sender=None):
+    """Stage an email in the current session; it is delivered after the caller commits."""
+    email = OutboxEmail(subject=subject, recipients=list(recipients), body=body, sender=sender)
+    db.session.add(email)
+    return email
+
+
+class EmailOutbox(BackgroundWorker):
+    """Delivers queued emails in batches over one SMTP connection, retrying with exponential backoff.
+
+    Rows are claimed with a lease before sending, so several gunicorn workers can run this
+    safely; a worker that dies mid-batch leaves its rows to be retried once the lease expires.
+    """
+
+    name = 'email-outbox'
+
+    def __init__(self, interval=15):
+        super().__init__(interval)
+        self.batch_size = 20
+        self.max_attempts = 6
+        self.backoff_seconds = 30
+        self.lease_seconds = 300
+
+    def init_app(self, app):
+        super().init_app(app)
+        self.interval = app.config.get('OUTBOX_POLL_INTERVAL', self.interval)
+        self.batch_size = app.config.get('OUTBOX_BATCH_SIZE', self.batch_size)
+        self.max_attempts = app.config.get('OUTBOX_MAX_ATTEMPTS', self.max_attempts)
+        self.backoff_seconds = app.config.get('OUTBOX_BACKOFF_SECONDS', self.backoff_seconds)
+        # Resume delivering anything left pending by a previous process once traffic arrives
+        app.before_request(self.ensure_started)
+
+    def wake(self):
+        self.ensure_started()
+        super().wake()
+
+    def stop(self, timeout=10):
+        # Only drain at exit if this process was sending; CLI commands and idle workers skip SMTP
+        if self.is_running():
+            super().stop(timeout)
+
+    def stats(self):
+        counts = dict(db.session.query(OutboxEmail.status, func.count(OutboxEmail.id)).group_by(OutboxEmail.status).all())
+        return {'pending': counts.get('pending', 0), 'sent': counts.get('sent', 0), 'failed': counts.get('failed', 0)}
+
+    def run_once(self):
+        while True:
+            batch = self._claim_batch()
+            if not batch:
+                return
+            self._deliver(batch)
+
+    def _claim_batch(self):
+        now = datetime.utcnow()
+        due = (OutboxEmail.status == 'pending', OutboxEmail.next_attempt_at <= now)
+        ids = list(db.session.scalars(select(OutboxEmail.id).where(*due).order_by(OutboxEmail.id).limit(self.batch_size)))
+        if not ids:
+            db.session.rollback()
+            return []
+        token = str(uuid.uuid4())
+        db.session.execute(
+            update(OutboxEmail).where(OutboxEmail.id.in_(ids), *due)
+            .values(claim_token=token, next_attempt_at=now + timedelta(seconds=self.lease_seconds))
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return OutboxEmail.query.filter_by(claim_token=token).order_by(OutboxEmail.id).all()
+
+    def _deliver(self, batch):
+        try:
+            with mail.connect() as connection:
+                for email in batch:
+                    try:
+                        connection.send(Message(subject=email.subject, recipients=email.recipients, body=email.body, sender=email.sender))
+                    except Exception as e:
+                        self._record_failure(email, e)
+                    else:
+                        email.status = 'sent'
+                        email.sent_at = datetime.utcnow()
+                        email.attempts += 1
+                        email.claim_token = None
+        except Exception as e:
+            # Could not open (or cleanly close) the SMTP connection; retry whatever is unsent
+            print(f"Email outbox SMTP connection failed: {e}")
+            for email in batch:
+                if email.status == 'pending' and email.claim_token is not None:
+                    self._record_failure(email, e)
+        db.session.commit()
+
+    def _record_failure(self, email, error):
+        email.attempts += 1
+        email.last_error = str(error)
+        email.claim_token = None
+        if email.attempts >= self.max_attempts:
+            email.status = 'failed'
+            print(f"Email {email.id} to {email.recipients} failed permanently: {error}")
+        else:
+            email.next_attempt_at = datetime.utcnow() + timedelta(seconds=self.backoff_seconds * 2 ** (email.attempts - 1))
+
+
+email_outbox = EmailOutbox()
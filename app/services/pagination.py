@@ -0,0 +1,62 @@
+import base64
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(values):
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, columns):
+    """Decode an opaque cursor back into typed values for columns; raises ValueError if malformed."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as e:
+        raise ValueError('Invalid cursor.') from e
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError('Invalid cursor.')
+    decoded = []
+    for column, value in zip(columns, values):
+        try:
+            decoded.append(datetime.fromisoformat(value) if column.type.python_type is datetime else column.type.python_type(value))
+        except (ValueError, TypeError) as e:
+            raise ValueError('Invalid cursor.') from e
+    return decoded
+
+
+def keyset_paginate(query, columns, cursor, limit):
+    """Return (items, pagination) for the page after cursor, newest first.
+
+    columns is the sort key, ending in a unique column (e.g. (Post.date_posted, Post.id)), so
+    each page is a single index range scan no matter how deep the reader has scrolled.
+    """
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        # Row-value comparison (a, b) < (x, y), spelled out for databases without tuple support
+        conditions = []
+        for i, (column, value) in enumerate(zip(columns, values)):
+            equal_prefix = [c == v for c, v in zip(columns[:i], values[:i])]
+            conditions.append(and_(*equal_prefix, column < value))
+        query = query.filter(or_(*conditions))
+
+    rows = query.order_by(None).order_by(*[c.desc() for c in columns]).limit(limit + 1).all()
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor([getattr(rows[-1], c.key) for c in columns]) if has_next else None
+    return rows, {'nextCursor': next_cursor, 'hasNext': has_next, 'perPage': limit}
+
+
+def date_range_filters(column, args):
+    """Conditions for ?from=YYYY-MM-DD&to=YYYY-MM-DD on column, both days inclusive; raises ValueError."""
+    conditions = []
+    try:
+        if args.get('from'):
+            conditions.append(column >= datetime.strptime(args['from'], '%Y-%m-%d'))
+        if args.get('to'):
+            conditions.append(column < datetime.strptime(args['to'], '%Y-%m-%d') + timedelta(days=1))
+    except ValueError as e:
+        raise ValueError('from and to must be YYYY-MM-DD dates.') from e
+    return conditions
@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import Counter
+
+from app.models.project import Project
+
+FACETS = ('tech_stack', 'tools')
+
+
+class ProjectIndex:
+    """Serialized projects in display order with an inverted index from each tech/tool to project ids.
+
+    Rebuilt after project writes in this process, and at most max_age seconds stale elsewhere.
+    """
+
+    def __init__(self, max_age=300):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._projects = []
+        self._postings = {facet: {} for facet in FACETS}
+        self._labels = {facet: {} for facet in FACETS}
+        self._built_at = None
+
+    def init_app(self, app):
+        self.max_age = app.config.get('PROJECT_INDEX_MAX_AGE', self.max_age)
+
+    def invalidate(self):
+        with self._lock:
+            self._built_at = None
+
+    def _ensure_built(self):
+        with self._lock:
+            if self._built_at is not None and time.monotonic() - self._built_at <= self.max_age:
+                return
+            projects = [p.to_dict() for p in Project.query.order_by(Project.order.asc(), Project.id.asc()).all()]
+            postings = {facet: {} for facet in FACETS}
+            labels = {facet: {} for facet in FACETS}
+            for position, project in enumerate(projects):
+                for facet in FACETS:
+                    for value in project[facet]:
+                        key = value.lower()
+                        postings[facet].setdefault(key, set()).add(position)
+                        labels[facet].setdefault(key, value)
+            self._projects, self._postings, self._labels = projects, postings, labels
+            self._built_at = time.monotonic()
+
+    def _matching(self, filters):
+        """Positions of projects having every requested value; filters maps facet -> [values]."""
+        positions = None
+        for facet, values in filters.items():
+            for value in values:
+                matches = self._postings[facet].get(value.strip().lower(), set())
+                positions = matches if positions is None else positions & matches
+        return range(len(self._projects)) if positions is None else sorted(positions)
+
+    def projects(self, filters=None):
+        self._ensure_built()
+        with self._lock:
+            return [self._projects[i] for i in self._matching(filters or {})]
+
+    def featured(self, limit=4):
+        self._ensure_built()
+        with self._lock:
+            return self._projects[:limit]
+
+    def facets(self, filters=None):
+        """Per-value project counts for each facet, within the projects matching filters."""
+        self._ensure_built()
+        with self._lock:
+            positions = self._matching(filters or {})
+            result = {}
+            for facet in FACETS:
+                counts = Counter(key for i in positions for key in {value.lower() for value in self._projects[i][facet]})
+                result[facet] = [
+                    {'name': self._labels[facet][key], 'count': count}
+                    for key, count in sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+                ]
+            return result
+
+
+project_index = ProjectIndex()
@@ -0,0 +1,189 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from functools import wraps
+
+from flask import jsonify, make_response, request
+
+UNITS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+
+def parse_policy(policy):
+    """'5/hour' or '30/60' -> (limit, period_seconds)."""
+    limit, _, period = policy.partition('/')
+    period = period.strip()
+    seconds = UNITS.get(period.rstrip('s'))
+    return int(limit), seconds if seconds else int(period)
+
+
+def sliding_window(prev_hits, cur_hits, window_start, limit, period, now):
+    """Sliding-window counter: the previous window's hits are weighted by how much of it still overlaps.
+
+    Returns (allowed, remaining, retry_after) for one more hit at `now`.
+    """
+    elapsed = (now - window_start) / period
+    estimate = prev_hits * (1 - elapsed) + cur_hits
+    if estimate + 1 <= limit:
+        return True, int(limit - estimate - 1), 0
+    if cur_hits + 1 <= limit and prev_hits:
+        # Wait until enough of the previous window has slid out
+        wait = window_start + period * (1 - (limit - cur_hits - 1) / prev_hits) - now
+    else:
+        # The current window alone is full; it has to become the (decaying) previous window
+        wait = window_start + period * (2 - (limit - 1) / max(cur_hits, 1)) - now
+    return False, 0, max(1, math.ceil(wait))
+
+
+class MemoryBackend:
+    """Per-process counters; each gunicorn worker enforces its own share of the limit."""
+
+    def __init__(self, sweep_every=1000):
+        self.sweep_every = sweep_every
+        self._windows = {}
+        self._hits_since_sweep = 0
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, period, now):
+        window_start = int(now // period * period)
+        with self._lock:
+            start, cur_hits, prev_hits = self._windows.get(key, (window_start, 0, 0))
+            if start != window_start:
+                prev_hits = cur_hits if start == window_start - period else 0
+                cur_hits = 0
+            allowed, remaining, retry_after = sliding_window(prev_hits, cur_hits, window_start, limit, period, now)
+            if allowed:
+                cur_hits += 1
+            self._windows[key] = (window_start, cur_hits, prev_hits)
+            self._hits_since_sweep += 1
+            if self._hits_since_sweep >= self.sweep_every:
+                self._sweep(now)
+        return allowed, remaining, retry_after, window_start + period
+
+    def _sweep(self, now):
+        self._hits_since_sweep = 0
+        stale = [key for key, (start, _, _) in self._windows.items() if start < now - 2 * UNITS['day']]
+        for key in stale:
+            del self._windows[key]
+
+
+class SQLiteBackend:
+    """Counters in a local SQLite file (WAL), shared by every worker process on the host."""
+
+    def __init__(self, path, sweep_every=1000):
+        self.path = path
+        self.sweep_every = sweep_every
+        self._local = threading.local()
+        self._hits_since_sweep = 0
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS rate_limit_hits ('
+                'key TEXT NOT NULL, window_start INTEGER NOT NULL, hits INTEGER NOT NULL, '
+                'PRIMARY KEY (key, window_start))'
+            )
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def hit(self, key, limit, period, now):
+        window_start = int(now // period * period)
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            rows = dict(conn.execute(
+                'SELECT window_start, hits FROM rate_limit_hits WHERE key = ? AND window_start >= ?',
+                (key, window_start - period)
+            ).fetchall())
+            allowed, remaining, retry_after = sliding_window(
+                rows.get(window_start - period, 0), rows.get(window_start, 0), window_start, limit, period, now
+            )
+            if allowed:
+                conn.execute(
+                    'INSERT INTO rate_limit_hits (key, window_start, hits) VALUES (?, ?, 1) '
+                    'ON CONFLICT (key, window_start) DO UPDATE SET hits = hits + 1',
+                    (key, window_start)
+                )
+                conn.execute('DELETE FROM rate_limit_hits WHERE key = ? AND window_start < ?', (key, window_start - period))
+            self._hits_since_sweep += 1
+            if self._hits_since_sweep >= self.sweep_every:
+                self._hits_since_sweep = 0
+                conn.execute('DELETE FROM rate_limit_hits WHERE window_start < ?', (now - 2 * UNITS['day'],))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return allowed, remaining, retry_after, window_start + period
+
+
+class RateLimiter:
+    """Named per-route policies checked against the configured backend."""
+
+    def __init__(self):
+        self.enabled = True
+        self.policies = {}
+        self.backend = MemoryBackend()
+        self._rejected = {}
+
+    def init_app(self, app):
+        self.enabled = app.config.get('RATE_LIMIT_ENABLED', self.enabled)
+        self.policies = {name: parse_policy(policy) for name, policy in app.config.get('RATE_LIMIT_POLICIES', {}).items()}
+        if app.config.get('RATE_LIMIT_BACKEND') == 'sqlite':
+            self.backend = SQLiteBackend(app.config.get('RATE_LIMIT_SQLITE_PATH') or os.path.join(app.instance_path, 'rate_limit.sqlite3'))
+            os.makedirs(os.path.dirname(self.backend.path), exist_ok=True)
+        else:
+            self.backend = MemoryBackend()
+
+    def stats(self):
+        return {'rejected': dict(self._rejected)}
+
+    def check(self, policy):
+        """Count one request against policy for the current client; None when the policy is unknown."""
+        if not self.enabled or policy not in self.policies:
+            return None
+        limit, period = self.policies[policy]
+        try:
+            allowed, remaining, retry_after, reset_at = self.backend.hit(f"{policy}:{request.remote_addr}", limit, period, time.time())
+        except Exception as e:
+            # Fail open: a broken limiter store should not take the endpoint down with it
+            print(f"Rate limiter unavailable: {e}")
+            return None
+        if not allowed:
+            self._rejected[policy] = self._rejected.get(policy, 0) + 1
+        return {
+            'allowed': allowed,
+            'headers': {
+                'RateLimit-Limit': str(limit),
+                'RateLimit-Remaining': str(remaining),
+                'RateLimit-Reset': str(retry_after or max(1, math.ceil(reset_at - time.time()))),
+                'RateLimit-Policy': f"{limit};w={period}"
+            },
+            'retry_after': retry_after
+        }
+
+
+rate_limiter = RateLimiter()
+
+
+def rate_limit(policy):
+    """Admit at most the RATE_LIMIT_POLICIES[policy] rate per client IP, else answer 429."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            result = rate_limiter.check(policy)
+            if result is None:
+                return view(*args, **kwargs)
+            if not result['allowed']:
+                response = make_response(jsonify({'error': 'Too many requests. Please try again later.'}), 429)
+                response.headers['Retry-After'] = str(result['retry_after'])
+            else:
+                response = make_response(view(*args, **kwargs))
+            response.headers.update(result['headers'])
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,75 @@
+from sqlalchemy import case, delete, func, insert, select, update
+
+from app import db
+from app.models.blog import Post, PostReadlistOrder, Readlist
+
+associations = PostReadlistOrder.__table__
+
+
+def _existing_ids(model, ids):
+    if not ids:
+        return set()
+    return set(db.session.scalars(select(model.id).where(model.id.in_(ids))))
+
+
+def _unique(ids):
+    return list(dict.fromkeys(int(i) for i in ids))
+
+
+def sync_post_readlists(post, readlist_ids):
+    """Make post belong to exactly readlist_ids, touching only the rows that change.
+
+    Newly joined readlists get the post appended at the end; existing positions are kept.
+    Does not commit. Returns the ids of readlists whose membership changed.
+    """
+    desired = _existing_ids(Readlist, _unique(readlist_ids))
+    current = set(db.session.scalars(select(associations.c.readlist_id).where(associations.c.post_id == post.id)))
+
+    added, removed = desired - current, current - desired
+    if removed:
+        db.session.execute(delete(associations).where(associations.c.post_id == post.id, associations.c.readlist_id.in_(removed)))
+    if added:
+        last_positions = dict(db.session.execute(
+            select(associations.c.readlist_id, func.coalesce(func.max(associations.c.post_order), -1))
+            .where(associations.c.readlist_id.in_(added))
+            .group_by(associations.c.readlist_id)
+        ).all())
+        db.session.execute(insert(associations), [
+            {'post_id': post.id, 'readlist_id': rl_id, 'post_order': last_positions.get(rl_id, -1) + 1}
+            for rl_id in added
+        ])
+    if added or removed:
+        db.session.expire(post, ['readlist_associations'])
+    return added | removed
+
+
+def sync_readlist_posts(readlist, post_ids):
+    """Make readlist contain exactly post_ids in that order with one INSERT, DELETE and UPDATE at most.
+
+    Does not commit. Returns the ids of posts whose membership or position changed.
+    """
+    existing = _existing_ids(Post, _unique(post_ids))
+    desired = {post_id: i for i, post_id in enumerate(p for p in _unique(post_ids) if p in existing)}
+    current = dict(db.session.execute(
+        select(associations.c.post_id, associations.c.post_order).where(associations.c.readlist_id == readlist.id)
+    ).all())
+
+    added = [post_id for post_id in desired if post_id not in current]
+    removed = [post_id for post_id in current if post_id not in desired]
+    moved = {post_id: order for post_id, order in desired.items() if post_id in current and current[post_id] != order}
+
+    if removed:
+        db.session.execute(delete(associations).where(associations.c.readlist_id == readlist.id, associations.c.post_id.in_(removed)))
+    if moved:
+        db.session.execute(
+            update(associations)
+            .where(associations.c.readlist_id == readlist.id, associations.c.post_id.in_(list(moved)))
+            .values(post_order=case(moved, value=associations.c.post_id))
+        )
+    if added:
+        db.session.execute(insert(associations), [
+            {'post_id': post_id, 'readlist_id': readlist.id, 'post_order': desired[post_id]} for post_id in added
+        ])
+    if added or removed or moved:
+        db.session.expire(readlist, ['post_associations'])
+    return set(added) | set(removed) | set(moved)
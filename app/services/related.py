@@ -0,0 +1,231 @@
+import math
+import threading
+from collections import Counter, defaultdict
+
+from sqlalchemy import delete, insert
+
+from app import db
+from app.models.blog import Post, PostReadlistOrder, PostTerms, RelatedPost
+from app.services.search import strip_html, tokenize
+from app.services.worker import BackgroundWorker
+
+SIMILAR_LIMIT = 2
+TITLE_WEIGHT = 3
+EXCERPT_WEIGHT = 2
+BODY_BATCH_SIZE = 200
+
+
+def _term_counts(title, excerpt, content):
+    counts = Counter(tokenize(strip_html(content)))
+    for term in tokenize(title):
+        counts[term] += TITLE_WEIGHT
+    for term in tokenize(excerpt):
+        counts[term] += EXCERPT_WEIGHT
+    return dict(counts)
+
+
+def _store_terms(post_ids=None):
+    """Recompute and persist term counts for post_ids (every post when None), streaming bodies."""
+    table = PostTerms.__table__
+    query = db.session.query(Post.id, Post.title, Post.excerpt, Post.content)
+    if post_ids is None:
+        db.session.execute(delete(table))
+    else:
+        post_ids = list(post_ids)
+        if not post_ids:
+            return
+        db.session.execute(delete(table).where(table.c.post_id.in_(post_ids)))
+        query = query.filter(Post.id.in_(post_ids))
+    batch = []
+    for post in query.yield_per(BODY_BATCH_SIZE):
+        batch.append({'post_id': post.id, 'terms': _term_counts(post.title, post.excerpt, post.content)})
+        if len(batch) >= BODY_BATCH_SIZE:
+            db.session.execute(insert(table), batch)
+            batch = []
+    if batch:
+        db.session.execute(insert(table), batch)
+
+
+def posts_missing_terms():
+    """Ids of posts with no stored term counts, e.g. everything right after the table was added."""
+    rows = db.session.query(Post.id).outerjoin(PostTerms, PostTerms.post_id == Post.id).filter(PostTerms.post_id.is_(None))
+    return {row.id for row in rows}
+
+
+def _tfidf_vectors(term_counts, post_ids):
+    """L2-normalised sparse TF-IDF vectors ({term: weight}) for post_ids; IDF spans every post."""
+    doc_freq = Counter(term for counts in term_counts.values() for term in counts)
+    total = len(term_counts)
+    vectors = {}
+    for post_id in post_ids:
+        counts = term_counts.get(post_id, {})
+        vector = {term: (1 + math.log(tf)) * (math.log((1 + total) / (1 + doc_freq[term])) + 1) for term, tf in counts.items()}
+        norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+        vectors[post_id] = {term: w / norm for term, w in vector.items()}
+    return vectors
+
+
+def _cosine(a, b):
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(w * b.get(term, 0.0) for term, w in a.items())
+
+
+def _most_similar(post_id, candidates, vectors, dates):
+    scored = [(_cosine(vectors[post_id], vectors[other]), dates[other], other) for other in candidates if other != post_id]
+    scored.sort(reverse=True)
+    return [(other, score) for score, _, other in scored[:SIMILAR_LIMIT]]
+
+
+def posts_referencing(post_ids):
+    """Ids of posts whose precomputed neighbours include any of post_ids."""
+    rows = db.session.query(RelatedPost.post_id).filter(RelatedPost.related_post_id.in_(post_ids)).distinct()
+    return {row.post_id for row in rows}
+
+
+def rebuild_related_posts(post_ids=None, also_refresh=(), reindex=()):
+    """Recompute the post_related table.
+
+    With post_ids, only the rows for those posts and the posts whose neighbours they can
+    change (date neighbours, same category, same readlists, current referrers) are rewritten,
+    and only the bodies of posts in reindex are read again; everything else is scored from
+    the stored term counts.
+    """
+    _store_terms(None if post_ids is None else reindex)
+    corpus = db.session.query(Post.id, Post.category_id, Post.date_posted).all()
+    readlists_by_post = defaultdict(set)
+    posts_by_readlist = defaultdict(set)
+    for assoc in db.session.query(PostReadlistOrder.post_id, PostReadlistOrder.readlist_id):
+        readlists_by_post[assoc.post_id].add(assoc.readlist_id)
+        posts_by_readlist[assoc.readlist_id].add(assoc.post_id)
+
+    timeline = sorted(corpus, key=lambda p: (p.date_posted, p.id))
+    position = {p.id: i for i, p in enumerate(timeline)}
+    dates = {p.id: p.date_posted for p in corpus}
+    by_category = defaultdict(set)
+    for p in corpus:
+        if p.category_id is not None:
+            by_category[p.category_id].add(p.id)
+
+    if post_ids is None:
+        affected = set(position)
+    else:
+        affected = set(post_ids) | set(also_refresh) | posts_referencing(post_ids)
+        for post_id in list(affected):
+            if post_id not in position:
+                continue
+            i = position[post_id]
+            affected.update(p.id for p in timeline[max(i - 1, 0):i + 2])
+            post = timeline[i]
+            affected |= by_category.get(post.category_id, set())
+            for readlist_id in readlists_by_post[post_id]:
+                affected |= posts_by_readlist[readlist_id]
+
+    affected &= set(position)
+    candidates = set(affected)
+    for post_id in affected:
+        candidates |= by_category.get(timeline[position[post_id]].category_id, set())
+        for readlist_id in readlists_by_post[post_id]:
+            candidates |= posts_by_readlist[readlist_id]
+    term_counts = {post_id: terms for post_id, terms in db.session.query(PostTerms.post_id, PostTerms.terms) if post_id in position}
+    vectors = _tfidf_vectors(term_counts, candidates)
+    rows = []
+    for post_id in affected:
+        i = position[post_id]
+        if i > 0:
+            rows.append({'post_id': post_id, 'kind': 'previous', 'rank': 0, 'related_post_id': timeline[i - 1].id, 'score': None})
+        if i + 1 < len(timeline):
+            rows.append({'post_id': post_id, 'kind': 'next', 'rank': 0, 'related_post_id': timeline[i + 1].id, 'score': None})
+        category_id = timeline[i].category_id
+        if category_id is not None:
+            for rank, (other, score) in enumerate(_most_similar(post_id, by_category[category_id], vectors, dates)):
+                rows.append({'post_id': post_id, 'kind': 'category', 'rank': rank, 'related_post_id': other, 'score': score})
+        series = set().union(*(posts_by_readlist[r] for r in readlists_by_post[post_id])) if readlists_by_post[post_id] else set()
+        for rank, (other, score) in enumerate(_most_similar(post_id, series, vectors, dates)):
+            rows.append({'post_id': post_id, 'kind': 'series', 'rank': rank, 'related_post_id': other, 'score': score})
+
+    table = RelatedPost.__table__
+    if post_ids is None:
+        db.session.execute(delete(table))
+    else:
+        # Rows of deleted posts (ON DELETE CASCADE covers this where the database enforces it)
+        gone = set(post_ids) - set(position)
+        if affected or gone:
+            db.session.execute(delete(table).where(table.c.post_id.in_(affected | gone)))
+        if gone:
+            db.session.execute(delete(PostTerms.__table__).where(PostTerms.__table__.c.post_id.in_(gone)))
+    if rows:
+        db.session.execute(insert(table), rows)
+    db.session.commit()
+    return len(rows)
+
+
+class RelatedPostsRefresher(BackgroundWorker):
+    """Applies queued related-post refreshes off the request thread.
+
+    Admin writes only record which posts changed; the worker folds everything queued since its
+    last pass into one incremental rebuild. Its first pass in each process also backfills posts
+    that have no stored term counts, which fills both tables after the first deploy.
+    """
+
+    name = 'related-posts'
+
+    def __init__(self, interval=30):
+        super().__init__(interval)
+        self._post_ids = set()
+        self._also_refresh = set()
+        self._reindex = set()
+        self._checked_missing = False
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        super().init_app(app)
+        self.interval = app.config.get('RELATED_REFRESH_INTERVAL', self.interval)
+
+    def enqueue(self, post_ids, also_refresh=(), reindex=()):
+        with self._lock:
+            self._post_ids.update(post_ids)
+            self._also_refresh.update(also_refresh)
+            self._reindex.update(reindex)
+        self.ensure_started()
+        self.wake()
+
+    def stop(self, timeout=10):
+        # Only finish queued work at exit if this process queued any; CLI commands skip the pass
+        if self.is_running():
+            super().stop(timeout)
+
+    def stats(self):
+        with self._lock:
+            return {'queued_posts': len(self._post_ids)}
+
+    def run_once(self):
+        if not self._checked_missing:
+            missing = posts_missing_terms()
+            self._checked_missing = True
+            if missing:
+                self.enqueue(missing, reindex=missing)
+        with self._lock:
+            post_ids, self._post_ids = self._post_ids, set()
+            also_refresh, self._also_refresh = self._also_refresh, set()
+            reindex, self._reindex = self._reindex, set()
+        if not post_ids and not also_refresh:
+            return
+        try:
+            rebuild_related_posts(post_ids, also_refresh, reindex)
+        except Exception:
+            db.session.rollback()
+            # Requeue so the next pass retries them
+            with self._lock:
+                self._post_ids |= post_ids
+                self._also_refresh |= also_refresh
+                self._reindex |= reindex
+            raise
+
+
+related_refresher = RelatedPostsRefresher()
+
+
+def refresh_related_posts(post_ids, also_refresh=(), content_changed=False):
+    """Queue an incremental refresh after an admin write; content_changed re-reads those posts' bodies."""
+    related_refresher.enqueue(post_ids, also_refresh, reindex=post_ids if content_changed else ())
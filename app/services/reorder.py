@@ -0,0 +1,76 @@
+import hashlib
+
+from flask import jsonify
+from sqlalchemy import case, update
+
+from app import db
+
+
+class StaleOrder(Exception):
+    pass
+
+
+def order_version(ids):
+    return hashlib.sha1(','.join(str(i) for i in ids).encode('ascii')).hexdigest()[:16]
+
+
+def current_order(model, lock=False):
+    """Returns (ids in display order, version) for a model with an integer `order` column."""
+    query = db.session.query(model.id, model.order).order_by(model.order.asc(), model.id.asc())
+    if lock:
+        # Serializes concurrent reorders of the same table on MySQL; a no-op on SQLite
+        query = query.with_for_update()
+    rows = query.all()
+    ids = [row.id for row in rows]
+    return ids, order_version(ids), {row.id: row.order for row in rows}
+
+
+def apply_order(model, ids, version):
+    """Set `order` to each id's position in one UPDATE ... CASE. Does not commit.
+
+    Raises StaleOrder unless version matches the current order and ids is exactly the current set,
+    so an admin working from an outdated list cannot silently drop or reshuffle items.
+    """
+    current_ids, current_version, positions = current_order(model, lock=True)
+    if version != current_version or len(ids) != len(set(ids)) or set(ids) != set(current_ids):
+        raise StaleOrder()
+    changed = {item_id: position for position, item_id in enumerate(ids) if positions[item_id] != position}
+    if changed:
+        db.session.execute(
+            update(model)
+            .where(model.id.in_(list(changed)))
+            .values(order=case(changed, value=model.id))
+            .execution_options(synchronize_session=False)
+        )
+    return order_version(ids)
+
+
+def order_response(model):
+    """GET handler body: the current ids in display order and their version."""
+    ids, version, _ = current_order(model)
+    return jsonify({'ids': ids, 'version': version})
+
+
+def reorder_response(model, payload):
+    """PUT handler body: validate {ids, version}, apply it and commit.
+
+    Answers 400 for a malformed payload and 409, with the current order, when it is stale; check
+    for a 200 before running any post-commit work.
+    """
+    payload = payload if isinstance(payload, dict) else {}
+    ids = payload.get('ids')
+    # bool is an int subclass, but True/False are not ids
+    if not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+        response = jsonify({'error': 'ids must be a list of integers.'})
+        response.status_code = 400
+        return response
+    try:
+        version = apply_order(model, ids, payload.get('version'))
+    except StaleOrder:
+        db.session.rollback()
+        current_ids, current_version, _ = current_order(model)
+        response = jsonify({'error': 'The list changed since it was loaded. Reload and try again.', 'ids': current_ids, 'version': current_version})
+        response.status_code = 409
+        return response
+    db.session.commit()
+    return jsonify({'ids': ids, 'version': version})
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models.order import SalesDaily
+
+
+def _bump(day, category_id, orders=0, sold=0, revenue=0.0):
+    """Add deltas to one rollup row inside the caller's transaction, creating it on first use."""
+    category_id = category_id or 0
+    values = {'orders': SalesDaily.orders + orders, 'sold': SalesDaily.sold + sold, 'revenue': SalesDaily.revenue + revenue}
+    where = (SalesDaily.day == day, SalesDaily.category_id == category_id)
+    if db.session.execute(update(SalesDaily).where(*where).values(**values)).rowcount:
+        return
+    try:
+        # Savepoint so losing an insert race to another request does not roll back the caller's work
+        with db.session.begin_nested():
+            db.session.add(SalesDaily(day=day, category_id=category_id, orders=orders, sold=sold, revenue=revenue))
+    except IntegrityError:
+        db.session.execute(update(SalesDaily).where(*where).values(**values))
+
+
+def record_order(order, product):
+    _bump((order.order_date or datetime.utcnow()).date(), product.category_id, orders=1)
+
+
+def record_sale_change(product, was_sold, old_price, old_category_id, old_sold_at):
+    """Reconcile the rollup after a product was created or edited. Call after applying the edit.
+
+    A product that turns sold gets sold_at stamped now; un-selling takes the sale back off the
+    day it was booked, and re-pricing or re-categorizing a sold product moves its revenue.
+    """
+    if not was_sold and not product.is_sold:
+        return
+    if was_sold and product.is_sold and old_price == product.price and old_category_id == product.category_id:
+        return
+    if was_sold and old_sold_at is not None:
+        _bump(old_sold_at.date(), old_category_id, sold=-1, revenue=-old_price)
+    if product.is_sold:
+        if not was_sold:
+            product.sold_at = datetime.utcnow()
+        # Products sold before sold_at existed have no day to book against and stay out of the series
+        if product.sold_at is not None:
+            _bump(product.sold_at.date(), product.category_id, sold=1, revenue=product.price)
+    else:
+        product.sold_at = None
+
+
+def record_product_deleted(product):
+    """Take a sold product's sale back off the day it was booked, before the product is deleted."""
+    if product.is_sold and product.sold_at is not None:
+        _bump(product.sold_at.date(), product.category_id, sold=-1, revenue=-product.price)
+
+
+def sales_series(first_day, last_day, category_id=None):
+    """Zero-filled daily totals plus a per-category breakdown, read from the rollup only."""
+    query = SalesDaily.query.filter(SalesDaily.day >= first_day, SalesDaily.day <= last_day)
+    if category_id is not None:
+        query = query.filter(SalesDaily.category_id == category_id)
+
+    days = {}
+    day = first_day
+    while day <= last_day:
+        days[day] = {'date': day.isoformat(), 'orders': 0, 'sold': 0, 'revenue': 0.0, 'by_category': {}}
+        day += timedelta(days=1)
+    for row in query.all():
+        point = days[row.day]
+        point['orders'] += row.orders
+        point['sold'] += row.sold
+        point['revenue'] += row.revenue
+        point['by_category'][str(row.category_id or 'none')] = {'orders': row.orders, 'sold': row.sold, 'revenue': row.revenue}
+    return list(days.values())
+
@@ -0,0 +1,220 @@
+import bisect
+import html
+import math
+import re
+import threading
+import time
+
+from sqlalchemy.orm import joinedload, undefer
+
+from app import db
+from app.models.blog import Post
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+TAG_RE = re.compile(r"<[^>]+>")
+STOPWORDS = frozenset((
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'but', 'by', 'for', 'from', 'how', 'i', 'in', 'into',
+    'is', 'it', 'its', 'of', 'on', 'or', 'so', 'that', 'the', 'their', 'this', 'to', 'was', 'we',
+    'what', 'when', 'which', 'with', 'you', 'your'
+))
+# Suffixes stripped in order, each with the minimum word length it applies to
+SUFFIXES = (('ies', 5, 'y'), ('ing', 6, ''), ('ed', 5, ''), ('es', 5, ''), ('ly', 5, ''), ('s', 4, ''), ('e', 5, ''))
+FIELD_WEIGHTS = {'title': 3.0, 'category': 2.0, 'excerpt': 1.5, 'content': 1.0}
+MAX_PREFIX_EXPANSIONS = 20
+SNIPPET_LENGTH = 200
+
+
+def strip_html(text):
+    return html.unescape(TAG_RE.sub(' ', text or ''))
+
+
+def stem(token):
+    for suffix, min_length, replacement in SUFFIXES:
+        if len(token) >= min_length and token.endswith(suffix) and not token.endswith('ss'):
+            return token[:-len(suffix)] + replacement
+    return token
+
+
+def tokenize(text):
+    return [stem(t) for t in TOKEN_RE.findall((text or '').lower()) if t not in STOPWORDS]
+
+
+def highlight(text, terms, length=SNIPPET_LENGTH):
+    """Cut a window of text around the first matching term and wrap matches in <mark>."""
+    matches = [m for m in TOKEN_RE.finditer(text.lower()) if stem(m.group()) in terms]
+    start = max(0, matches[0].start() - length // 4) if matches else 0
+    end = min(len(text), start + length)
+    parts, cursor = [], start
+    for m in matches:
+        if m.start() < start:
+            continue
+        if m.end() > end:
+            break
+        parts.append(html.escape(text[cursor:m.start()]))
+        parts.append(f"<mark>{html.escape(text[m.start():m.end()])}</mark>")
+        cursor = m.end()
+    parts.append(html.escape(text[cursor:end]))
+    snippet = ' '.join(''.join(parts).split())
+    return ('…' if start > 0 else '') + snippet + ('…' if end < len(text) else '')
+
+
+class SearchIndex:
+    """In-memory inverted index over published posts, ranked with BM25."""
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self, max_age=300):
+        self.max_age = max_age
+        self.backend = 'memory'
+        self._lock = threading.RLock()
+        self._reset()
+        self._built_at = None
+
+    def init_app(self, app):
+        self.max_age = app.config.get('SEARCH_INDEX_MAX_AGE', self.max_age)
+        self.backend = app.config.get('SEARCH_BACKEND', self.backend)
+
+    def _reset(self):
+        self._postings = {}
+        self._doc_terms = {}
+        self._doc_lengths = {}
+        self._docs = {}
+        self._vocabulary = []
+        self._total_length = 0.0
+
+    # --- Index maintenance ---
+    def invalidate(self):
+        with self._lock:
+            self._built_at = None
+
+    def ensure_built(self):
+        with self._lock:
+            if self._built_at is None or time.monotonic() - self._built_at > self.max_age:
+                self.rebuild()
+
+    def rebuild(self):
+        posts = Post.query.options(undefer(Post.content), joinedload(Post.category)).all()
+        with self._lock:
+            self._reset()
+            for post in posts:
+                self._add(post)
+            self._built_at = time.monotonic()
+
+    def index_post(self, post):
+        with self._lock:
+            if self._built_at is None:
+                return
+            self._remove(post.id)
+            self._add(post)
+
+    def remove_post(self, post_id):
+        with self._lock:
+            if self._built_at is not None:
+                self._remove(post_id)
+
+    def _add(self, post):
+        text = strip_html(post.content)
+        fields = {
+            'title': post.title, 'excerpt': post.excerpt, 'content': text,
+            'category': post.category.name if post.category else None
+        }
+        weights = {}
+        for field, value in fields.items():
+            for term in tokenize(value):
+                weights[term] = weights.get(term, 0.0) + FIELD_WEIGHTS[field]
+        for term, weight in weights.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                bisect.insort(self._vocabulary, term)
+            postings[post.id] = weight
+        length = sum(weights.values())
+        self._doc_terms[post.id] = set(weights)
+        self._doc_lengths[post.id] = length
+        self._docs[post.id] = {'excerpt': post.excerpt or '', 'text': text}
+        self._total_length += length
+
+    def _remove(self, post_id):
+        for term in self._doc_terms.pop(post_id, ()):
+            postings = self._postings[term]
+            postings.pop(post_id, None)
+            if not postings:
+                del self._postings[term]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, term)]
+        self._total_length -= self._doc_lengths.pop(post_id, 0.0)
+        self._docs.pop(post_id, None)
+
+    # --- Querying ---
+    def _expand_prefix(self, prefix):
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        expansions = []
+        for term in self._vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not term.startswith(prefix):
+                break
+            expansions.append(term)
+        return expansions
+
+    def _query_terms(self, query):
+        """Map each query term to its boost; the last word also matches as a prefix (search-as-you-type)."""
+        words = [w for w in TOKEN_RE.findall(query.lower()) if w not in STOPWORDS]
+        terms = {stem(w): 1.0 for w in words}
+        if words and len(words[-1]) >= 2:
+            for term in self._expand_prefix(words[-1]):
+                terms.setdefault(term, 0.8)
+        return terms
+
+    def search(self, query, offset=0, limit=10):
+        """Return (total, [(post_id, score, snippet)]) for one page of ranked results."""
+        self.ensure_built()
+        with self._lock:
+            terms = self._query_terms(query)
+            doc_count = len(self._doc_lengths)
+            if not terms or not doc_count:
+                return 0, []
+            avg_length = self._total_length / doc_count
+            scores = {}
+            for term, boost in terms.items():
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for post_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[post_id] / avg_length)
+                    scores[post_id] = scores.get(post_id, 0.0) + boost * idf * tf * (self.k1 + 1) / (tf + norm)
+
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+            page = ranked[offset:offset + limit]
+            return len(ranked), [(post_id, score, self._snippet(post_id, terms)) for post_id, score in page]
+
+    def _snippet(self, post_id, terms):
+        doc = self._docs[post_id]
+        text = doc['text'] if any(stem(m) in terms for m in TOKEN_RE.findall(doc['text'].lower())) else doc['excerpt']
+        return highlight(text or doc['text'], terms)
+
+
+search_index = SearchIndex()
+
+
+def _use_fulltext():
+    return search_index.backend == 'mysql' and db.engine.dialect.name == 'mysql'
+
+
+def _fulltext_search(query, offset, limit):
+    from sqlalchemy.dialects.mysql import match
+
+    score = match(Post.title, Post.excerpt, Post.content, against=query).in_natural_language_mode()
+    base = db.session.query(Post.id, score.label('score')).filter(score > 0)
+    total = base.count()
+    rows = base.order_by(score.desc(), Post.id.desc()).offset(offset).limit(limit).all()
+    ids = [row.id for row in rows]
+    texts = dict(db.session.query(Post.id, Post.content).filter(Post.id.in_(ids)).all()) if ids else {}
+    terms = {stem(w) for w in TOKEN_RE.findall(query.lower())}
+    return total, [(row.id, float(row.score), highlight(strip_html(texts.get(row.id)), terms)) for row in rows]
+
+
+def search_posts(query, offset=0, limit=10):
+    """Rank posts for query, using MySQL FULLTEXT when configured and available."""
+    if _use_fulltext():
+        return _fulltext_search(query, offset, limit)
+    return search_index.search(query, offset, limit)
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+
+DAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+# Slot starts and booking claims share one grid of `step`-sized blocks. A fixed midnight anchors it,
+# so any step that divides a day puts slots on the hour / half hour whatever the window starts are.
+GRID_ORIGIN = datetime(2000, 1, 1)
+
+
+def grid_ceil(moment, step):
+    """First grid point at or after moment."""
+    return GRID_ORIGIN + -(-(moment - GRID_ORIGIN) // step) * step
+
+
+def on_grid(moment, step):
+    return (moment - GRID_ORIGIN) % step == timedelta(0)
+
+
+def expand_windows(availabilities, first_day, last_day):
+    """Turn weekly Availability rows into concrete (start, end) datetimes for each day in range."""
+    by_day = {}
+    for availability in availabilities:
+        by_day.setdefault(availability.day_of_week.strip().lower(), []).append((availability.start_time, availability.end_time))
+
+    windows = []
+    day = first_day
+    while day <= last_day:
+        for start_time, end_time in by_day.get(DAYS[day.weekday()], ()):
+            start, end = datetime.combine(day, start_time), datetime.combine(day, end_time)
+            if end <= start:
+                # e.g. 22:00-00:00 runs into the next day
+                end += timedelta(days=1)
+            windows.append((start, end))
+        day += timedelta(days=1)
+    return merge_intervals(windows)
+
+
+def merge_intervals(intervals):
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def free_slots(windows, busy, duration, step, not_before=None):
+    """Sweep sorted windows against merged busy intervals and cut what is left into slots.
+
+    Slots start on the `step` grid (see GRID_ORIGIN) and are `duration` long; both are
+    timedeltas. Returns a sorted list of (start, end).
+    """
+    busy = merge_intervals(busy)
+    slots = []
+    i = 0
+    for window_start, window_end in windows:
+        # Busy intervals ending before this window can never matter again
+        while i < len(busy) and busy[i][1] <= window_start:
+            i += 1
+        start = grid_ceil(window_start, step)
+        j = i
+        while start + duration <= window_end:
+            end = start + duration
+            while j < len(busy) and busy[j][1] <= start:
+                j += 1
+            if j < len(busy) and busy[j][0] < end:
+                # Overlaps a booking: jump to the first grid point at or after it ends
+                start = grid_ceil(busy[j][1], step)
+                continue
+            if not_before is None or start >= not_before:
+                slots.append((start, end))
+            start += step
+    return slots
+
+
+def claim_granules(start, end, granule):
+    """Start times of every `granule`-sized grid block that [start, end) touches."""
+    current = start - (start - GRID_ORIGIN) % granule
+    granules = []
+    while current < end:
+        granules.append(current)
+        current += granule
+    return granules
@@ -0,0 +1,276 @@
+import base64
+import json
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.services.worker import BackgroundWorker
+
+# Default/Offline Fallback Response (using user's actual profile URL)
+DEFAULT_TRACK = {
+    "is_playing": False,
+    "title": "Last Last",
+    "artist": "Burna Boy",
+    "album_art": "https://images.unsplash.com/photo-1614613535308-eb5fbd3d2c17?q=80&w=300&auto=format&fit=crop",
+    "progress_ms": 180000,
+    "duration_ms": 230000,
+    "track_url": "https://open.spotify.com/user/31uyiyix7zv5vnia63hcvdt4xzry?si=67e9059882504770"
+}
+
+
+def _normalize_track(track, is_playing, progress_ms):
+    images = track.get("album", {}).get("images", [])
+    return {
+        "is_playing": is_playing,
+        "title": track.get("name"),
+        "artist": ", ".join([artist.get("name") for artist in track.get("artists", [])]),
+        "album_art": images[0].get("url") if images else DEFAULT_TRACK["album_art"],
+        "progress_ms": progress_ms,
+        "duration_ms": track.get("duration_ms", 0),
+        "track_url": track.get("external_urls", {}).get("spotify", DEFAULT_TRACK["track_url"])
+    }
+
+
+class SpotifyClient:
+    """Now-playing lookups over a pooled session, with the access token and the result cached.
+
+    The access token is reused until shortly before it expires, and the normalized payload is
+    kept for `ttl` seconds; concurrent misses wait on a single upstream fetch.
+    """
+
+    def __init__(self, ttl=5, timeout=5, token_margin=60):
+        self.ttl = ttl
+        self.timeout = timeout
+        self.token_margin = token_margin
+        self.client_id = None
+        self.client_secret = None
+        self.refresh_token = None
+        self.token_url = 'https://accounts.spotify.com/api/token'
+        self.api_url = 'https://api.spotify.com/v1'
+        self._session = None
+        self._session_pid = None
+        self._access_token = None
+        self._token_expires_at = 0
+        self._payload = None
+        self._payload_expires_at = 0
+        self._token_lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._stats = {'cache_hits': 0, 'upstream_fetches': 0, 'token_refreshes': 0}
+
+    def init_app(self, app):
+        self.client_id = app.config.get('SPOTIFY_CLIENT_ID')
+        self.client_secret = app.config.get('SPOTIFY_CLIENT_SECRET')
+        self.refresh_token = app.config.get('SPOTIFY_REFRESH_TOKEN')
+        self.token_url = app.config.get('SPOTIFY_TOKEN_URL', self.token_url)
+        self.api_url = app.config.get('SPOTIFY_API_URL', self.api_url).rstrip('/')
+        self.ttl = app.config.get('SPOTIFY_NOW_PLAYING_TTL', self.ttl)
+        self.timeout = app.config.get('SPOTIFY_TIMEOUT', self.timeout)
+
+    @property
+    def configured(self):
+        return bool(self.client_id and self.client_secret and self.refresh_token)
+
+    @property
+    def session(self):
+        # Connection pools must not be shared across a fork, so each worker process builds its own
+        if self._session is None or self._session_pid != os.getpid():
+            session = requests.Session()
+            session.mount('https://', HTTPAdapter(pool_connections=2, pool_maxsize=4))
+            session.mount('http://', HTTPAdapter(pool_connections=2, pool_maxsize=4))
+            self._session, self._session_pid = session, os.getpid()
+        return self._session
+
+    def stats(self):
+        return dict(self._stats)
+
+    def get_access_token(self):
+        if not self.configured:
+            return None
+        if self._access_token and time.monotonic() < self._token_expires_at:
+            return self._access_token
+        with self._token_lock:
+            if self._access_token and time.monotonic() < self._token_expires_at:
+                return self._access_token
+            auth_header = base64.b64encode(f"{self.client_id}:{self.client_secret}".encode("utf-8")).decode("utf-8")
+            headers = {
+                "Authorization": f"Basic {auth_header}",
+                "Content-Type": "application/x-www-form-urlencoded"
+            }
+            data = {
+                "grant_type": "refresh_token",
+                "refresh_token": self.refresh_token
+            }
+            try:
+                res = self.session.post(self.token_url, headers=headers, data=data, timeout=self.timeout)
+                self._stats['token_refreshes'] += 1
+                if res.status_code == 200:
+                    body = res.json()
+                    self._access_token = body.get("access_token")
+                    self._token_expires_at = time.monotonic() + max(int(body.get("expires_in", 3600)) - self.token_margin, 0)
+                    return self._access_token
+            except Exception as e:
+                print("Spotify token error:", e)
+            return None
+
+    def now_playing(self):
+        if self._payload is not None and time.monotonic() < self._payload_expires_at:
+            self._stats['cache_hits'] += 1
+            return self._payload
+        with self._fetch_lock:
+            # Whoever waited on the lock gets the payload the first caller just fetched
+            if self._payload is not None and time.monotonic() < self._payload_expires_at:
+                self._stats['cache_hits'] += 1
+                return self._payload
+            return self._refresh_locked()
+
+    def refresh(self):
+        """Fetch now-playing from upstream regardless of the cache and store the result."""
+        with self._fetch_lock:
+            return self._refresh_locked()
+
+    def _refresh_locked(self):
+        self._stats['upstream_fetches'] += 1
+        self._payload = self._fetch_now_playing()
+        self._payload_expires_at = time.monotonic() + self.ttl
+        return self._payload
+
+    def _fetch_now_playing(self):
+        access_token = self.get_access_token()
+        if not access_token:
+            return DEFAULT_TRACK
+
+        headers = {
+            "Authorization": f"Bearer {access_token}"
+        }
+        try:
+            # 1. Query currently playing
+            res = self.session.get(f"{self.api_url}/me/player/currently-playing", headers=headers, timeout=self.timeout)
+            if res.status_code == 401:
+                # Token revoked early; refresh on the next fetch
+                self._token_expires_at = 0
+            if res.status_code == 200 and res.content:
+                data = res.json()
+                item = data.get("item")
+                if item:
+                    return _normalize_track(item, data.get("is_playing", False), data.get("progress_ms", 0))
+
+            # 2. If nothing playing, query recently played
+            res = self.session.get(f"{self.api_url}/me/player/recently-played", params={"limit": 1}, headers=headers, timeout=self.timeout)
+            if res.status_code == 200 and res.content:
+                items = res.json().get("items", [])
+                if items and items[0].get("track"):
+                    return _normalize_track(items[0]["track"], False, 0)
+        except Exception as e:
+            print("Spotify now playing error:", e)
+
+        return DEFAULT_TRACK
+
+
+class SpotifyPoller(BackgroundWorker):
+    """Polls now-playing on a schedule and fans changes out to server-sent event streams.
+
+    One upstream poll per interval serves every connected client; an event is only pushed
+    when the track or play state changes, and streams send a comment as a keep-alive.
+    Every open stream occupies a server thread, so streams end after max_age seconds with a
+    retry hint and the browser's EventSource reconnects on its own.
+    """
+
+    name = 'spotify-poller'
+
+    def __init__(self, client, interval=10, heartbeat=25, max_clients=8, max_age=300, reconnect_ms=3000):
+        super().__init__(interval)
+        self.client = client
+        self.heartbeat = heartbeat
+        self.max_clients = max_clients
+        self.max_age = max_age
+        self.reconnect_ms = reconnect_ms
+        self._event = None
+        self._version = 0
+        self._signature = None
+        self._subscribers = 0
+        self._changed = threading.Condition()
+
+    def init_app(self, app):
+        super().init_app(app)
+        self.interval = app.config.get('SPOTIFY_POLL_INTERVAL', self.interval)
+        self.heartbeat = app.config.get('SPOTIFY_STREAM_HEARTBEAT', self.heartbeat)
+        self.max_clients = app.config.get('SPOTIFY_STREAM_MAX_CLIENTS', self.max_clients)
+        self.max_age = app.config.get('SPOTIFY_STREAM_MAX_AGE', self.max_age)
+        self.reconnect_ms = app.config.get('SPOTIFY_STREAM_RECONNECT_MS', self.reconnect_ms)
+
+    def stats(self):
+        with self._changed:
+            return {'subscribers': self._subscribers, 'version': self._version}
+
+    def run_once(self):
+        # Nobody is listening; plain GETs still go through the client's own cache
+        if not self._subscribers:
+            return
+        self.publish(self.client.refresh())
+
+    def publish(self, payload):
+        # progress_ms moves on every poll, so it is left out of what counts as a change
+        signature = (payload.get('title'), payload.get('artist'), payload.get('track_url'), payload.get('is_playing'))
+        with self._changed:
+            if signature == self._signature:
+                return
+            self._signature = signature
+            self._version += 1
+            self._event = f"id: {self._version}\nevent: now-playing\ndata: {json.dumps(payload)}\n\n"
+            self._changed.notify_all()
+
+    def subscribe(self):
+        """Reserve a stream slot; returns a callable that frees it, or None once max_clients streams are open.
+
+        The callable may be called any number of times; the slot is freed once.
+        """
+        with self._changed:
+            if self._subscribers >= self.max_clients:
+                return None
+            self._subscribers += 1
+            first = self._subscribers == 1
+        self.ensure_started()
+        if first:
+            # The poller idles while nobody listens, so fetch fresh state for the first listener
+            self.wake()
+
+        released = threading.Event()
+
+        def release():
+            with self._changed:
+                if not released.is_set():
+                    released.set()
+                    self._subscribers -= 1
+        return release
+
+    def stream(self, release):
+        """Yield the current state, then each change, for up to max_age seconds; release frees the slot."""
+        try:
+            deadline = time.monotonic() + self.max_age
+            with self._changed:
+                if self._event is None:
+                    self._changed.wait_for(lambda: self._event is not None, self.heartbeat)
+                seen = self._version
+                event = self._event
+            yield f"retry: {self.reconnect_ms}\n" + (event if event is not None else ": waiting\n\n")
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                with self._changed:
+                    self._changed.wait_for(lambda: self._version != seen, min(self.heartbeat, remaining))
+                    changed = self._version != seen
+                    seen, event = self._version, self._event
+                if changed:
+                    yield event
+                elif time.monotonic() < deadline:
+                    yield ": keep-alive\n\n"
+        finally:
+            release()
+
+
+spotify_client = SpotifyClient()
+spotify_poller = SpotifyPoller(spotify_client)
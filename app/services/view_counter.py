@@ -0,0 +1,107 @@
+import threading
+from collections import Counter
+
+from sqlalchemy import bindparam, func
+
+from app import db
+from app.models.blog import Post
+from app.services.worker import BackgroundWorker
+
+
+class ViewCounter(BackgroundWorker):
+    """Buffers post views in memory and applies them as batched atomic increments.
+
+    Only slugs of existing posts are buffered, so junk slugs cannot grow the pending counter.
+    """
+
+    name = 'view-counter'
+
+    def __init__(self, interval=5, flush_threshold=100):
+        super().__init__(interval)
+        self.flush_threshold = flush_threshold
+        self._pending = Counter()
+        self._pending_events = 0
+        self._flushed_events = 0
+        self._known_slugs = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        super().init_app(app)
+        self.interval = app.config.get('VIEW_COUNT_FLUSH_INTERVAL', self.interval)
+        self.flush_threshold = app.config.get('VIEW_COUNT_FLUSH_EVENTS', self.flush_threshold)
+
+    def post_exists(self, slug):
+        """Membership in the set of known slugs, loaded once; a miss is re-checked against the table."""
+        if self._known_slugs is None:
+            slugs = {slug for slug, in db.session.query(Post.slug)}
+            with self._lock:
+                self._known_slugs = slugs
+        if slug in self._known_slugs:
+            return True
+        # Posts created since the set was loaded (possibly by another process)
+        if db.session.query(Post.id).filter_by(slug=slug).first() is None:
+            return False
+        with self._lock:
+            self._known_slugs.add(slug)
+        return True
+
+    def forget(self, slug):
+        """Drop a deleted or renamed post's slug from the known set."""
+        with self._lock:
+            if self._known_slugs is not None:
+                self._known_slugs.discard(slug)
+
+    def record(self, slug):
+        """Buffer one view; returns False without buffering when no post has this slug."""
+        if not self.post_exists(slug):
+            return False
+        with self._lock:
+            self._pending[slug] += 1
+            self._pending_events += 1
+            pending_events = self._pending_events
+        self.ensure_started()
+        if pending_events >= self.flush_threshold:
+            self.wake()
+        return True
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pending_views': self._pending_events,
+                'pending_posts': len(self._pending),
+                'flushed_views': self._flushed_events
+            }
+
+    def run_once(self):
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, Counter()
+            events, self._pending_events = self._pending_events, 0
+        if not batch:
+            return 0
+
+        post = Post.__table__
+        stmt = (
+            post.update()
+            .where(post.c.slug == bindparam('b_slug'))
+            .values(view_count=func.coalesce(post.c.view_count, 0) + bindparam('b_delta'))
+        )
+        try:
+            db.session.execute(stmt, [{'b_slug': slug, 'b_delta': delta} for slug, delta in batch.items()])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            # Put the deltas back so the next flush retries them
+            with self._lock:
+                self._pending.update(batch)
+                self._pending_events += events
+            raise
+
+        with self._lock:
+            self._flushed_events += events
+        return events
+
+
+view_counter = ViewCounter()
@@ -0,0 +1,73 @@
+import atexit
+import os
+import threading
+
+
+class BackgroundWorker:
+    """Daemon thread that calls run_once() every `interval` seconds, or sooner when woken.
+
+    The thread is started lazily from inside a worker process (never at import time), so it
+    survives gunicorn's fork. On interpreter exit it is stopped and given one final pass.
+    """
+
+    name = 'background-worker'
+
+    def __init__(self, interval=5):
+        self.interval = interval
+        self._app = None
+        self._thread = None
+        self._pid = None
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._start_lock = threading.Lock()
+        self._exit_hook_registered = False
+
+    def init_app(self, app):
+        self._app = app
+        if not self._exit_hook_registered:
+            atexit.register(self.stop)
+            self._exit_hook_registered = True
+
+    def run_once(self):
+        raise NotImplementedError
+
+    def is_running(self):
+        return self._thread is not None and self._pid == os.getpid() and self._thread.is_alive()
+
+    def ensure_started(self):
+        if self.is_running():
+            return
+        with self._start_lock:
+            if self.is_running() or self._app is None:
+                return
+            self._pid = os.getpid()
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+            self._thread.start()
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self, timeout=10):
+        if self._app is None:
+            return
+        if self.is_running():
+            self._stopping.set()
+            self._wake.set()
+            self._thread.join(timeout)
+        else:
+            self._run()
+
+    def _loop(self):
+        while not self._stopping.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self._run()
+        self._run()
+
+    def _run(self):
+        with self._app.app_context():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"{self.name} failed: {e}")
@@ -0,0 +1,27 @@
+"""Add FULLTEXT index on post title, excerpt and content
+
+Revision ID: 3f1c8a9d2b47
+Revises: fdb72b95cf7e
+Create Date: 2026-10-18 10:12:04.518233
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c8a9d2b47'
+down_revision = 'fdb72b95cf7e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # FULLTEXT only exists on MySQL; other backends use the in-memory search index
+    if op.get_context().dialect.name == 'mysql':
+        op.create_index('ix_post_fulltext', 'post', ['title', 'excerpt', 'content'], unique=False, mysql_prefix='FULLTEXT')
+
+
+def downgrade():
+    if op.get_context().dialect.name == 'mysql':
+        op.drop_index('ix_post_fulltext', table_name='post')
@@ -0,0 +1,30 @@
+"""Add post_terms table for incremental related-post scoring
+
+Revision ID: 6a3f9d2c1e80
+Revises: 91c6d4a0e5b7
+Create Date: 2026-10-18 20:12:37.514203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6a3f9d2c1e80'
+down_revision = '91c6d4a0e5b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('post_terms',
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('terms', sa.JSON(), nullable=False),
+    sa.ForeignKeyConstraint(['post_id'], ['post.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('post_id')
+    )
+    # Filled (along with post_related) by the related-posts worker's first pass after deploy
+
+
+def downgrade():
+    op.drop_table('post_terms')
@@ -0,0 +1,34 @@
+"""Add post_related table for precomputed related posts
+
+Revision ID: 8d2e61b0c5a3
+Revises: 3f1c8a9d2b47
+Create Date: 2026-10-18 11:03:41.207655
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2e61b0c5a3'
+down_revision = '3f1c8a9d2b47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('post_related',
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=10), nullable=False),
+    sa.Column('rank', sa.Integer(), nullable=False),
+    sa.Column('related_post_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['post_id'], ['post.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['related_post_id'], ['post.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('post_id', 'kind', 'rank')
+    )
+    # Populate with `flask rebuild-related` after upgrading
+
+
+def downgrade():
+    op.drop_table('post_related')
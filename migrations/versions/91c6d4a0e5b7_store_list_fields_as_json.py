@@ -0,0 +1,63 @@
+"""Store project and product list fields as JSON arrays
+
+Revision ID: 91c6d4a0e5b7
+Revises: 4d7b0e2f8a61
+Create Date: 2026-10-18 15:58:03.227491
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '91c6d4a0e5b7'
+down_revision = '4d7b0e2f8a61'
+branch_labels = None
+depends_on = None
+
+# (table, column, old type, separator)
+LIST_COLUMNS = [
+    ('project', 'tech_stack', sa.String(length=200), ','),
+    ('project', 'tools', sa.String(length=200), ','),
+    ('product', 'features', sa.Text(), '\n'),
+    ('product', 'gallery_images', sa.Text(), ','),
+]
+
+
+def _split(value, separator):
+    return [item.strip() for item in (value or '').split(separator) if item.strip()]
+
+
+def _convert(table, column, separator, to_json):
+    """Copy column into column_new, parsing strings into lists (or joining lists back)."""
+    conn = op.get_bind()
+    rows = conn.execute(sa.text(f"SELECT id, {column} FROM {table}")).fetchall()
+    for row_id, value in rows:
+        if to_json:
+            new_value = json.dumps(_split(value, separator))
+        else:
+            items = json.loads(value) if isinstance(value, str) else (value or [])
+            new_value = separator.join(items) or None
+        conn.execute(sa.text(f"UPDATE {table} SET {column}_new = :value WHERE id = :id"), {'value': new_value, 'id': row_id})
+
+
+def upgrade():
+    for table, column, old_type, separator in LIST_COLUMNS:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column(f'{column}_new', sa.JSON(), nullable=True))
+        _convert(table, column, separator, to_json=True)
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column(column)
+            batch_op.alter_column(f'{column}_new', new_column_name=column, existing_type=sa.JSON(), nullable=False)
+
+
+def downgrade():
+    for table, column, old_type, separator in LIST_COLUMNS:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column(f'{column}_new', old_type, nullable=True))
+        _convert(table, column, separator, to_json=False)
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column(column)
+            batch_op.alter_column(f'{column}_new', new_column_name=column, existing_type=old_type, nullable=True)
@@ -0,0 +1,28 @@
+"""Add uploaded_image.queued_at so lost variant jobs can be re-queued
+
+Revision ID: a83e5d2f9c14
+Revises: f47c1a9b3e26
+Create Date: 2026-10-18 22:31:08.514926
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a83e5d2f9c14'
+down_revision = 'f47c1a9b3e26'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('uploaded_image', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('queued_at', sa.DateTime(), nullable=True))
+    # Rows already pending were queued when they were created
+    op.execute("UPDATE uploaded_image SET queued_at = created_at WHERE status = 'pending'")
+
+
+def downgrade():
+    with op.batch_alter_table('uploaded_image', schema=None) as batch_op:
+        batch_op.drop_column('queued_at')
@@ -0,0 +1,59 @@
+"""Rebuild booking slot claims on the slot-step grid
+
+Revision ID: d58e2b7a4c19
+Revises: 6a3f9d2c1e80
+Create Date: 2026-10-18 20:41:55.108372
+
+"""
+from datetime import datetime, timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd58e2b7a4c19'
+down_revision = '6a3f9d2c1e80'
+branch_labels = None
+depends_on = None
+
+# Must match app.services.slots.GRID_ORIGIN
+GRID_ORIGIN = datetime(2000, 1, 1)
+
+
+def upgrade():
+    # Claims were 15-minute blocks; bookings now claim BOOKING_SLOT_STEP_MINUTES (default 30) blocks
+    _rebuild_claims(timedelta(minutes=30))
+
+
+def downgrade():
+    _rebuild_claims(timedelta(minutes=15))
+
+
+def _rebuild_claims(granule):
+    conn = op.get_bind()
+    conn.execute(sa.text("DELETE FROM booking_slot_claim"))
+    bookings = conn.execute(sa.text(
+        "SELECT id, meeting_time, meeting_duration FROM booking "
+        "WHERE status IN ('Pending', 'Confirmed') AND meeting_time >= :now ORDER BY id"
+    ), {'now': datetime.utcnow()}).fetchall()
+    claimed = set()
+    rows = []
+    for booking_id, meeting_time, duration in bookings:
+        if isinstance(meeting_time, str):
+            meeting_time = datetime.fromisoformat(meeting_time)
+        for slot in claim_granules(meeting_time, meeting_time + timedelta(minutes=duration), granule):
+            # Overlaps that already exist keep the earlier booking's claim
+            if slot not in claimed:
+                claimed.add(slot)
+                rows.append({'slot_start': slot, 'booking_id': booking_id})
+    if rows:
+        claims = sa.table('booking_slot_claim', sa.column('slot_start', sa.DateTime()), sa.column('booking_id', sa.Integer()))
+        op.bulk_insert(claims, rows)
+
+
+def claim_granules(start, end, granule):
+    current = start - (start - GRID_ORIGIN) % granule
+    while current < end:
+        yield current
+        current += granule
@@ -0,0 +1,29 @@
+"""Backfill booking.created_at and make it NOT NULL
+
+Revision ID: e2f8a4d61c07
+Revises: d58e2b7a4c19
+Create Date: 2026-10-18 21:02:14.630981
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2f8a4d61c07'
+down_revision = 'd58e2b7a4c19'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # created_at is the admin listing's cursor key, so it cannot be NULL. Rows from before it was
+    # always set get their meeting time, the closest thing to a request date they have.
+    op.execute("UPDATE booking SET created_at = meeting_time WHERE created_at IS NULL")
+    with op.batch_alter_table('booking', schema=None) as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('booking', schema=None) as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
@@ -0,0 +1,29 @@
+"""Seed the default about row so public reads never insert it
+
+Revision ID: e6b3f81a9c04
+Revises: a41d7c9e3b25
+Create Date: 2026-10-18 13:42:16.503771
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6b3f81a9c04'
+down_revision = 'a41d7c9e3b25'
+branch_labels = None
+depends_on = None
+
+DEFAULT_BIO = "Welcome to my page. Edit this bio in the admin panel."
+
+
+def upgrade():
+    conn = op.get_bind()
+    if conn.execute(sa.text("SELECT COUNT(*) FROM about")).scalar() == 0:
+        conn.execute(sa.text("INSERT INTO about (bio) VALUES (:bio)"), {'bio': DEFAULT_BIO})
+
+
+def downgrade():
+    # Leave the row in place; it may have been edited since
+    pass
@@ -0,0 +1,32 @@
+"""Add change_stamp table for feed Last-Modified
+
+Revision ID: f47c1a9b3e26
+Revises: e2f8a4d61c07
+Create Date: 2026-10-18 22:05:41.377019
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f47c1a9b3e26'
+down_revision = 'e2f8a4d61c07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    change_stamp = op.create_table('change_stamp',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('changed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # Nothing tells us when the feed last changed, so start its clock at the upgrade
+    op.bulk_insert(change_stamp, [{'name': 'feed', 'changed_at': datetime.utcnow()}])
+
+
+def downgrade():
+    op.drop_table('change_stamp')
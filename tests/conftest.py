@@ -0,0 +1,55 @@
+import os
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.dialects.mysql import MEDIUMTEXT
+from sqlalchemy.ext.compiler import compiles
+
+os.environ.setdefault('JWT_SECRET_KEY', 'test-jwt-secret-key-of-reasonable-length')
+
+from app import create_app, db  # noqa: E402
+from app.config import Config  # noqa: E402
+from app.services.outbox import email_outbox  # noqa: E402
+
+
+@compiles(MEDIUMTEXT, 'sqlite')
+def _mediumtext_on_sqlite(element, compiler, **kw):
+    return 'TEXT'
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    RESPONSE_CACHE_DISABLED = True
+    RATE_LIMIT_ENABLED = False
+    MAIL_SUPPRESS_SEND = True
+
+
+@pytest.fixture
+def app():
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        # Test requests start the outbox sender; let it finish before its table goes away
+        email_outbox.stop()
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def statements(app):
+    """SQL statements executed while the fixture is active, in order."""
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    yield executed
+    event.remove(db.engine, 'before_cursor_execute', record)
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models.blog import Category, Post, PostReadlistOrder, Readlist
+
+
+def seed_readlists(count, posts_per_readlist=3):
+    category = Category(name='Engineering', slug='engineering', color='#000000')
+    db.session.add(category)
+    db.session.flush()
+    for r in range(count):
+        readlist = Readlist(name=f'Series {r}', slug=f'series-{r}', order=r)
+        db.session.add(readlist)
+        db.session.flush()
+        for p in range(posts_per_readlist):
+            post = Post(
+                title=f'Series {r} part {p}', slug=f'series-{r}-part-{p}', content='<p>Body</p>',
+                category_id=category.id, date_posted=datetime(2025, 1, 1) + timedelta(days=p)
+            )
+            db.session.add(post)
+            db.session.flush()
+            db.session.add(PostReadlistOrder(post_id=post.id, readlist_id=readlist.id, post_order=posts_per_readlist - p))
+    db.session.commit()
+    db.session.expunge_all()
+
+
+@pytest.mark.parametrize('count', [1, 25])
+def test_public_readlists_query_count_is_flat(client, statements, count):
+    seed_readlists(count)
+    statements.clear()
+
+    response = client.get('/api/blog/readlists')
+
+    assert response.status_code == 200
+    assert len(response.json) == count
+    assert all(len(readlist['posts']) == 3 for readlist in response.json)
+    assert len(statements) == 2
+
+
+def test_with_posts_keeps_post_order_and_categories(app, statements):
+    seed_readlists(2)
+    statements.clear()
+
+    readlists = Readlist.with_posts().order_by(Readlist.order.asc()).all()
+    data = [readlist.to_dict(include_posts=True) for readlist in readlists]
+
+    assert len(statements) == 2
+    assert [post['slug'] for post in data[0]['posts']] == ['series-0-part-2', 'series-0-part-1', 'series-0-part-0']
+    assert data[1]['posts'][0]['category']['slug'] == 'engineering'